@@ -3,6 +3,7 @@
 カメラ設定の読み込みと管理機能を提供します
 """
 import os
+import re
 import logging
 from datetime import datetime
 import config
@@ -12,12 +13,29 @@ import requests
 # グローバル変数としてカメラ設定をキャッシュ
 _camera_cache = None
 _camera_names_cache = None
+# 有効なカメラのリストと、作成時の設定ファイルのバージョン（(mtime_ns, size)）
+_enabled_cameras_cache = None
+_enabled_cameras_version = None
 # カメラの再起動試行回数を記録
 _camera_restart_attempts = {}
 # カメラ再起動の連続試行最大回数
 MAX_CAMERA_RESTART_ATTEMPTS = 3
 # カメラ再起動の間隔（秒）
 CAMERA_RESTART_INTERVAL = 60
+# ログ出力用にRTSP URLの認証情報を隠すパターン
+_RTSP_REDACT = re.compile(r'(rtsps?://)[^@/\s]+@')
+
+def mask_rtsp_url(rtsp_url):
+    """
+    RTSP URLの認証情報を***:***に置き換える（ログ出力用）
+
+    Args:
+        rtsp_url (str): RTSP URL
+
+    Returns:
+        str: 認証情報を隠したURL
+    """
+    return _RTSP_REDACT.sub(r'\1***:***@', rtsp_url)
 
 def read_config():
     """
@@ -52,7 +70,9 @@ def read_config():
                         'id': parts[0],
                         'name': parts[1],
                         'rtsp_url': parts[2],
-                        'enabled': enabled
+                        'enabled': enabled,
+                        # ログ出力用（認証情報は実行中に変わらないので読み込み時に一度だけ作る）
+                        '_safe_rtsp_url': mask_rtsp_url(parts[2])
                     })
             
             # キャッシュを更新
@@ -70,11 +90,12 @@ def reload_config():
     Returns:
         list: 最新のカメラ情報リスト
     """
-    global _camera_cache, _camera_names_cache
+    global _camera_cache, _camera_names_cache, _enabled_cameras_cache
     
     # キャッシュをクリア
     _camera_cache = None
     _camera_names_cache = None
+    _enabled_cameras_cache = None
     
     # 設定を再読み込み
     return read_config()
@@ -349,8 +370,24 @@ def reset_camera_restart_attempts(camera_id=None):
 def get_enabled_cameras():
     """
     有効なカメラ（enabled=1）のみを返す
+    設定ファイルが更新されていれば再読み込みし、それ以外は前回のリストを使う
     Returns:
         list: 有効なカメラ情報のリスト
     """
-    cameras = read_config()
-    return [cam for cam in cameras if cam.get('enabled', 1) == 1]
+    global _enabled_cameras_cache, _enabled_cameras_version
+    
+    try:
+        st = os.stat(config.CONFIG_PATH)
+        version = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        version = None
+    
+    if _enabled_cameras_cache is None or version != _enabled_cameras_version:
+        # 前回から設定ファイルが変わっていれば読み直す
+        if _enabled_cameras_version is not None and version != _enabled_cameras_version:
+            cameras = reload_config()
+        else:
+            cameras = read_config()
+        _enabled_cameras_cache = [cam for cam in cameras if cam.get('enabled', 1) == 1]
+        _enabled_cameras_version = version
+    return list(_enabled_cameras_cache)
@@ -45,6 +45,7 @@ MAX_RETRY_DELAY = int(os.getenv('MAX_RETRY_DELAY', '90'))  # 最大再試行遅
 
 # リソース制限設定
 MAX_CONCURRENT_STREAMS = int(os.getenv('MAX_CONCURRENT_STREAMS', '10'))  # 最大同時ストリーミング数
+MAX_SPAWN_PARALLELISM = int(os.getenv('MAX_SPAWN_PARALLELISM', '2'))  # 同時に起動処理を行うFFmpegの最大数
 RESOURCE_CHECK_INTERVAL = int(os.getenv('RESOURCE_CHECK_INTERVAL', '30'))  # リソースチェック間隔（秒）
 MAX_CPU_PERCENT = int(os.getenv('MAX_CPU_PERCENT', '80'))  # 最大CPU使用率（%）
 MAX_MEM_PERCENT = int(os.getenv('MAX_MEM_PERCENT', '80'))  # 最大メモリ使用率（%）
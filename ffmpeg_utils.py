@@ -10,6 +10,7 @@ import time
 import re
 import os
 import threading
+import functools
 import config
 import requests
 from datetime import datetime
@@ -115,21 +116,37 @@ def check_stream_details(rtsp_url, timeout=10):
         logging.error(f"Error checking stream details: {e}")
         return None
 
-def kill_ffmpeg_processes(camera_id=None, pid=None, process_type=None):
+def kill_ffmpeg_processes(camera_id=None, pid=None, process_type=None, pids=None):
     """
     実行中のFFmpegプロセスを強制終了する。
     camera_idまたはpidを指定すると特定のプロセスのみ終了。
     process_type（'recording'または'hls'）で用途別に限定終了。
     両方指定されていない場合はすべてのFFmpegプロセスを終了。
+    pidsを指定した場合はプロセス一覧を走査せず、そのPIDだけを終了する。
     
     Args:
         camera_id (str, optional): カメラID
         pid (int, optional): プロセスID
         process_type (str, optional): 'recording'または'hls'で用途限定
+        pids (iterable of int, optional): 終了するPID（呼び出し側が起動して終了を確認していないもの）
     Returns:
         bool: 操作が成功したかどうか
     """
     try:
+        if pids is not None:
+            for tpid in pids:
+                try:
+                    if os.name == 'nt':
+                        subprocess.run(['taskkill', '/F', '/PID', str(tpid)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                    else:
+                        os.kill(int(tpid), 9)
+                    logging.info(f"FFmpegプロセス(PID:{tpid})を終了しました")
+                except ProcessLookupError:
+                    pass
+                except Exception as e:
+                    logging.warning(f"FFmpegプロセス(PID:{tpid})の終了に失敗: {e}")
+            return True
+
         logging.info(f"kill_ffmpeg_processes: camera_id={camera_id}, pid={pid}, process_type={process_type} の停止を開始")
 
         # Windowsの場合
@@ -710,6 +727,14 @@ def get_hls_streaming_command(input_url, output_path, segment_time=2, buffer_siz
     Returns:
         list: FFmpegコマンドのリスト
     """
+    # 同じカメラの再起動では同じ引数になるので生成結果をキャッシュし、呼び出し側にはコピーを返す
+    return list(_build_hls_streaming_command(input_url, output_path, segment_time, buffer_size))
+
+@functools.lru_cache(maxsize=64)
+def _build_hls_streaming_command(input_url, output_path, segment_time, buffer_size):
+    """
+    get_hls_streaming_commandの本体（GPU判定のPATH検索を含むため結果をタプルでキャッシュする）
+    """
     import shutil
     output_dir = os.path.dirname(output_path)
     filename = os.path.splitext(os.path.basename(output_path))[0]
@@ -724,7 +749,7 @@ def get_hls_streaming_command(input_url, output_path, segment_time=2, buffer_siz
     else:
         vcodec_args += ['-preset', 'veryfast', '-b:v', '4000k', '-maxrate', '5000k', '-bufsize', '8000k']
 
-    return [
+    return (
         ffmpeg_path,
         '-loglevel', 'debug',
         '-rtsp_transport', 'tcp',
@@ -760,7 +785,7 @@ def get_hls_streaming_command(input_url, output_path, segment_time=2, buffer_siz
         '-f', 'hls',
         '-y',
         output_path
-    ]
+    )
 
 def start_hls_streaming(camera_info):
     """
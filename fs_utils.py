@@ -586,3 +586,45 @@ def remove_directory(dir_path):
     except Exception as e:
         logging.error(f"ディレクトリ {dir_path} の削除中にエラーが発生しました: {e}")
         return False
+
+# read_cpu_stat()の前回値 (idle, total)
+_prev_cpu_times = None
+
+def read_meminfo():
+    """
+    /proc/meminfoからメモリ使用率を取得する（Linux専用）
+
+    Returns:
+        float: メモリ使用率（%）
+    """
+    values = {}
+    with open('/proc/meminfo', 'rb') as f:
+        for line in f.read().splitlines():
+            key, _, rest = line.partition(b':')
+            if key in (b'MemTotal', b'MemAvailable'):
+                values[key] = int(rest.split()[0])
+                if len(values) == 2:
+                    break
+    total = values[b'MemTotal']
+    return (total - values[b'MemAvailable']) / total * 100
+
+def read_cpu_stat():
+    """
+    /proc/statの先頭行から前回呼び出し以降のCPU使用率を計算する（Linux専用）
+    初回呼び出し時は基準値を記録して0.0を返す（psutil.cpu_percent(interval=None)と同じ扱い）
+
+    Returns:
+        float: CPU使用率（%）
+    """
+    global _prev_cpu_times
+    with open('/proc/stat', 'rb') as f:
+        fields = f.readline().split()
+    # user nice system idle iowait irq softirq steal（guestはuserに含まれるため除外）
+    times = [int(v) for v in fields[1:9]]
+    idle = times[3] + times[4]
+    total = sum(times)
+    prev = _prev_cpu_times
+    _prev_cpu_times = (idle, total)
+    if prev is None or total == prev[1]:
+        return 0.0
+    return (1 - (idle - prev[0]) / (total - prev[1])) * 100
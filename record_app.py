@@ -439,8 +439,8 @@ def get_system_status():
         # 録画状況を取得
         recording_status = {
             "active_processes": len(recording.recording_processes),
-            "start_times": {k: v.isoformat() if hasattr(v, 'isoformat') else str(v) 
-                           for k, v in recording.recording_start_times.items()}
+            "start_times": {k: v.start_time.isoformat()
+                           for k, v in list(recording.recording_processes.items())}
         }
         
         return jsonify({
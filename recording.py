@@ -7,19 +7,112 @@ import logging
 import threading
 import time
 import traceback
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 import subprocess
+import concurrent.futures
 import psutil  # ← 追加
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import PatternMatchingEventHandler
+except ImportError:  # watchdog未導入時は定期スキャンのみで監視する
+    Observer = None
+    PatternMatchingEventHandler = object
 
 import config
 import ffmpeg_utils
 import fs_utils
 import camera_utils
 
+@dataclass(slots=True)
+class RecordingSession:
+    """
+    録画中のカメラ1台分の状態
+    """
+    process: subprocess.Popen
+    url: str
+    file_path: str
+    start_time: datetime
+    hls: bool
+    psproc: psutil.Process = None
+    has_audio: bool = False
+    last_poll_ts: float = 0.0  # get_recording_statusで最後にpoll()した時刻（time.monotonic）
+    last_poll_alive: bool = True
+
 # グローバル変数
-recording_processes = {}
+recording_processes = {}  # カメラID -> RecordingSession
 recording_threads = {}
-recording_start_times = {}  # 録画開始時刻を保持する辞書
+recording_stop_events = {}  # 録画時間監視スレッドを即時に起こすためのイベント
+# recording_processesの読み書きを保護するロック
+recording_lock = threading.RLock()
+# FFmpeg子プロセスに渡す環境変数（起動のたびにコピーしないよう一度だけ作成）
+_CHILD_ENV = dict(os.environ)
+# 自己修復監視スレッドを即時に起こすためのイベント
+_selfheal_wake = threading.Event()
+# ディスク空き容量の監視結果（バックグラウンドスレッドが更新）
+DISK_CHECK_INTERVAL = 30  # 空き容量チェック間隔（秒）
+_disk_ok = True
+_disk_free_bytes = 0
+# 録画切り替え時のFFmpegコマンド（URLと出力パス以外は固定なので事前に組み立てておく）
+_ROT_CMD_HEAD = (
+    config.FFMPEG_PATH,
+    '-loglevel', 'debug',
+    '-rtsp_transport', 'tcp',
+    '-buffer_size', '32768k',
+    '-use_wallclock_as_timestamps', '1',
+)
+_ROT_CMD_VIDEO = (
+    '-r', '30',
+    '-vf', 'scale=trunc(iw/2)*2:trunc(ih/2)*2,format=yuv420p',
+    '-c:v', 'h264_nvenc',
+    '-gpu', '0',
+    '-preset', 'fast',
+    '-rc', 'vbr',
+    '-profile:v', 'high',
+    '-b:v', '4M',
+)
+_ROT_CMD_OUTPUT = (
+    '-max_muxing_queue_size', '2048',
+    '-fflags', '+genpts+discardcorrupt+igndts',
+    '-avoid_negative_ts', 'make_zero',
+    '-start_at_zero',
+    '-fps_mode', 'cfr',
+    '-async', '1',
+    '-movflags', '+faststart+frag_keyframe',
+)
+_ROT_CMD_TAIL_AUDIO = ('-c:a', 'aac', '-b:a', '128k', '-ar', '44100', '-ac', '2') + _ROT_CMD_OUTPUT
+_ROT_CMD_TAIL_NOAUDIO = ('-an',) + _ROT_CMD_OUTPUT
+# 録画ファイル最終化（faststart再多重化）用のワーカープール
+_finalize_pool = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="mp4-finalize")
+# 最終化中の一時ファイル（<録画ファイル>.temp.mp4）のパス。自己修復の残存一時ファイル削除から除外する
+_finalizing_temp_paths = set()
+
+def _submit_finalize(file_path):
+    """
+    録画ファイルの最終化をワーカーに投入する（完了するまで一時ファイルを削除対象から外す）
+
+    Args:
+        file_path (str): 最終化する録画ファイルのパス
+    """
+    temp_path = file_path + '.temp.mp4'
+    _finalizing_temp_paths.add(temp_path)
+    future = _finalize_pool.submit(ffmpeg_utils.finalize_recording, file_path)
+    future.add_done_callback(lambda _f: _finalizing_temp_paths.discard(temp_path))
+
+def _ps_process(pid):
+    """
+    起動直後のFFmpegのpsutil.Processを取得する（既に終了していればNone）
+
+    Args:
+        pid (int): プロセスID
+
+    Returns:
+        psutil.Process or None: 取得できなかった場合はNone
+    """
+    try:
+        return psutil.Process(pid)
+    except psutil.Error:
+        return None
 
 def start_recording(camera_id, rtsp_url):
     """
@@ -46,19 +139,18 @@ def start_recording(camera_id, rtsp_url):
         camera_dir = os.path.join(config.BASE_PATH, "record", camera_id)
         fs_utils.ensure_directory_exists(camera_dir)
 
-        # ディスク容量チェック（最小1GB必要）
-        required_space = 1024 * 1024 * 1024 * config.MIN_DISK_SPACE_GB
-        available_space = fs_utils.get_free_space(camera_dir)
-
-        if available_space < required_space:
+        # ディスク容量チェック（監視スレッドの最新結果を参照）
+        if not _disk_ok:
             error_msg = f"Insufficient disk space for camera {camera_id}. " \
-                        f"Available: {available_space / (1024*1024*1024):.2f} GB, " \
+                        f"Available: {_disk_free_bytes / (1024*1024*1024):.2f} GB, " \
                         f"Required: {config.MIN_DISK_SPACE_GB} GB"
             logging.error(error_msg)
             raise Exception(error_msg)
 
         # 新しい録画を開始
-        start_new_recording(camera_id, rtsp_url)
+        if start_new_recording(camera_id, rtsp_url):
+            # 自己修復監視に新しい録画をすぐ取り込ませる
+            _selfheal_wake.set()
 
         # 録画時間監視スレッドを必ず起動（重複起動防止）
         if camera_id not in recording_threads or not recording_threads[camera_id].is_alive():
@@ -96,10 +188,10 @@ def start_new_recording(camera_id, rtsp_url):
             stop_recording(camera_id)
             time.sleep(2)  # 停止処理の完了を待機
 
-        # ディスク容量チェック
-        logging.info(f"Free space check for camera {camera_id}")
-        if not check_disk_space(camera_id):
-            logging.error(f"ディスク容量不足のため録画を開始できません: カメラ {camera_id}")
+        # ディスク容量チェック（監視スレッドの最新結果を参照）
+        if not _disk_ok:
+            logging.error(f"ディスク容量不足のため録画を開始できません: カメラ {camera_id} "
+                          f"(空き容量: {_disk_free_bytes / (1024 * 1024 * 1024):.2f} GB)")
             return False
 
         # 日時を含むファイルパスを生成
@@ -154,48 +246,43 @@ def start_new_recording(camera_id, rtsp_url):
         logging.info(f"Executing FFmpeg command: {cmd_str}")
         logging.info(f"Starting FFmpeg process with command: {cmd_str}")
 
-        my_env = os.environ.copy()
         process = subprocess.Popen(
             ffmpeg_cmd,
-            env=my_env,
+            env=_CHILD_ENV,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
+            close_fds=True,
             creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
         )
-        time.sleep(1)
-        if process.poll() is None:
-            logging.info(f"FFmpeg process started with PID: {process.pid}")
-            start_time = datetime.now()
-            recording_processes[camera_id] = {
-                'process': process,
-                'url': rtsp_url,
-                'file_path': file_path,
-                'start_time': start_time,
-                'hls': use_hls,
-            }
-            recording_start_times[camera_id] = start_time
-            time.sleep(0.5)
-            if process.poll() is None:
-                logging.info(f"Recording process started with PID {process.pid}")
-                if process.stderr:
-                    threading.Thread(target=monitor_ffmpeg_output, args=(process, camera_id), daemon=True).start()
-                return True
-            else:
-                # プロセスが即時終了した場合、stderr全文をログ出力
-                try:
-                    stderr_output = process.stderr.read().decode('utf-8', errors='replace')
-                    logging.error(f"FFmpeg process failed to start for camera {camera_id}. STDERR:\n{stderr_output}")
-                except Exception as e:
-                    logging.error(f"FFmpeg stderr読み取り中に例外: {e}")
-                return False
-        else:
-            # プロセスが即時終了した場合、stderr全文をログ出力
-            try:
-                stderr_output = process.stderr.read().decode('utf-8', errors='replace')
-                logging.error(f"FFmpeg process failed to start for camera {camera_id}. STDERR:\n{stderr_output}")
-            except Exception as e:
-                logging.error(f"FFmpeg stderr読み取り中に例外: {e}")
-            return False
+        # 起動直後に終了しないか確認（正常起動時はタイムアウトで抜ける）
+        try:
+            return_code = process.wait(timeout=1.5)
+        except subprocess.TimeoutExpired:
+            return_code = None
+
+        if return_code is None:
+            logging.info(f"Recording process started with PID {process.pid}")
+            session = RecordingSession(
+                process=process,
+                url=rtsp_url,
+                file_path=file_path,
+                start_time=datetime.now(),
+                hls=use_hls,
+                psproc=_ps_process(process.pid),
+            )
+            with recording_lock:
+                recording_processes[camera_id] = session
+            if process.stderr:
+                threading.Thread(target=monitor_ffmpeg_output, args=(process, camera_id), daemon=True).start()
+            return True
+
+        # プロセスが即時終了した場合、stderrの先頭（最大64KB）をログ出力
+        try:
+            stderr_output = process.stderr.read(65536).decode('utf-8', errors='replace')
+            logging.error(f"FFmpeg process failed to start for camera {camera_id} (exit code {return_code}). STDERR:\n{stderr_output}")
+        except Exception as e:
+            logging.error(f"FFmpeg stderr読み取り中に例外: {e}")
+        return False
     except Exception as e:
         logging.error(f"Error in start_new_recording for camera {camera_id}: {e}")
         return False
@@ -231,14 +318,17 @@ def stop_recording(camera_id):
     """
     logging.info(f"カメラ {camera_id} の録画停止処理を開始します")
 
-    recording_info = recording_processes.pop(camera_id, None)
+    with recording_lock:
+        recording_info = recording_processes.pop(camera_id, None)
 
-    if camera_id in recording_start_times:
-        del recording_start_times[camera_id]
+    # 録画時間監視スレッドを即時に起こす
+    stop_event = recording_stop_events.get(camera_id)
+    if stop_event:
+        stop_event.set()
 
     if recording_info:
-        process = recording_info['process']
-        file_path = recording_info['file_path']
+        process = recording_info.process
+        file_path = recording_info.file_path
 
         try:
             logging.info(f"録画プロセス (PID: {process.pid}) を停止します。ファイル: {file_path}")
@@ -246,9 +336,14 @@ def stop_recording(camera_id):
             # プロセスを終了
             ffmpeg_utils.terminate_process(process)
 
-            # ファイル存在確認
-            if os.path.exists(file_path):
-                file_size = os.path.getsize(file_path)
+            # ファイル存在確認（statは1回のみ）
+            try:
+                file_size = os.stat(file_path).st_size
+            except FileNotFoundError:
+                file_size = None
+                logging.error(f"録画ファイルが見つかりません: {file_path}")
+
+            if file_size is not None:
                 logging.info(f"録画ファイルのサイズ: {file_size / 1024:.2f} KB")
 
                 # 1MB未満の小さなファイルは不完全と見なして削除
@@ -260,9 +355,9 @@ def stop_recording(camera_id):
                     except Exception as del_err:
                         logging.error(f"ファイル削除エラー: {del_err}")
                 elif file_size > 0:
-                    # 十分なサイズのファイルは最終化する
-                    logging.info(f"録画ファイルを最終化します: {file_path}")
-                    ffmpeg_utils.finalize_recording(file_path)
+                    # 十分なサイズのファイルは最終化する（呼び出し元をブロックしないようワーカーで実行）
+                    logging.info(f"録画ファイルの最終化をキューに追加します: {file_path}")
+                    _submit_finalize(file_path)
                 else:
                     logging.warning(f"録画ファイルが空です: {file_path}")
                     try:
@@ -270,17 +365,7 @@ def stop_recording(camera_id):
                         logging.info(f"空の録画ファイルを削除しました: {file_path}")
                     except Exception as del_err:
                         logging.error(f"ファイル削除エラー: {del_err}")
-            else:
-                logging.error(f"録画ファイルが見つかりません: {file_path}")
 
-            # 録画情報を削除
-            if camera_id in recording_processes:
-                del recording_processes[camera_id]
-                
-            # 録画開始時間情報も削除
-            if camera_id in recording_start_times:
-                del recording_start_times[camera_id]
-                
             logging.info(f"カメラ {camera_id} の録画を正常に停止しました")
             return True
 
@@ -302,20 +387,31 @@ def check_recording_duration(camera_id):
     logging.info(f"カメラ {camera_id} の録画時間監視を開始しました（最大録画時間: {config.MAX_RECORDING_MINUTES}分）")
     
     CHECK_INTERVAL = 0.2  # 監視間隔を0.2秒に短縮し、切り替え精度を向上
+    REMAINING_LOG_INTERVAL = timedelta(seconds=30)  # 残り時間ログの出力間隔
+    log_start_time = None  # 残り時間ログの基準となる録画開始時刻
+    next_log_at = None  # 次に残り時間をログ出力する時刻
+    # stop_recordingから即時に起こせるようにイベントを登録
+    stop_event = threading.Event()
+    recording_stop_events[camera_id] = stop_event
     
     while True:
         try:
+            stop_event.clear()
             # カメラが録画中かチェック
             if camera_id not in recording_processes:
                 logging.info(f"カメラ {camera_id} の録画が停止されたため、録画時間監視スレッドを終了します")
                 break
 
             # 開始時間を取得
-            start_time = recording_start_times.get(camera_id)
-            if not start_time:
-                logging.warning(f"カメラ {camera_id} の録画開始時間が記録されていません")
-                time.sleep(1)  # 少し待機して再チェック
+            recording_info = recording_processes.get(camera_id)
+            if recording_info is None:
                 continue
+            start_time = recording_info.start_time
+
+            # 録画が切り替わった場合は残り時間ログの予定時刻を再設定
+            if start_time != log_start_time:
+                log_start_time = start_time
+                next_log_at = start_time + REMAINING_LOG_INTERVAL
 
             # 現在の経過時間を計算
             current_time = datetime.now()
@@ -327,10 +423,17 @@ def check_recording_duration(camera_id):
             max_duration = config.MAX_RECORDING_MINUTES * 60  # 分を秒に変換
             
             # 残り時間をログに出力（30秒ごと）
-            if int(duration_seconds) % 30 == 0 and abs(duration_seconds - round(duration_seconds)) < CHECK_INTERVAL:
+            if current_time >= next_log_at:
                 remaining_seconds = max_duration - duration_seconds
                 if remaining_seconds > 0:
                     logging.info(f"カメラ {camera_id} の録画残り時間: {remaining_seconds:.1f}秒（{remaining_seconds/60:.1f}分）")
+                next_log_at += REMAINING_LOG_INTERVAL
+
+            # 期限まで余裕がある間は、期限の1秒前か次のログ時刻まで眠る（停止時はイベントで即時に起床）
+            if max_duration - duration_seconds > 5:
+                wake_at = min(start_time + timedelta(seconds=max_duration - 1), next_log_at)
+                stop_event.wait(max((wake_at - current_time).total_seconds(), CHECK_INTERVAL))
+                continue
             
             # 最大録画時間を超えた場合、録画を再開
             if duration_seconds >= max_duration:
@@ -338,8 +441,7 @@ def check_recording_duration(camera_id):
                 
                 camera_config = camera_utils.get_camera_by_id(camera_id)
                 if camera_config and camera_config.get('rtsp_url'):
-                    recording_info = recording_processes.get(camera_id)
-                    current_rtsp_url = recording_info.get('url') if recording_info else None
+                    current_rtsp_url = recording_info.url
                     if stop_recording(camera_id):
                         # 録画停止直後に即時再開
                         rtsp_url_to_use = camera_config['rtsp_url']
@@ -352,63 +454,34 @@ def check_recording_duration(camera_id):
                         logging.info(f"使用するソース: RTSP, URL: {rtsp_url_to_use}")
                         try:
                             has_audio = ffmpeg_utils.check_audio_stream(rtsp_url_to_use)
-                            ffmpeg_cmd = [
-                                config.FFMPEG_PATH,
-                                '-loglevel', 'debug',
-                                '-rtsp_transport', 'tcp',
-                                '-buffer_size', '32768k',
-                                '-use_wallclock_as_timestamps', '1',
-                                '-i', rtsp_url_to_use,
-                                '-r', '30',
-                                '-vf', 'scale=trunc(iw/2)*2:trunc(ih/2)*2,format=yuv420p',
-                                '-c:v', 'h264_nvenc',
-                                '-gpu', '0',
-                                '-preset', 'fast',
-                                '-rc', 'vbr',
-                                '-profile:v', 'high',
-                                '-b:v', '4M'
-                            ]
-                            if has_audio:
-                                ffmpeg_cmd.extend([
-                                    '-c:a', 'aac',
-                                    '-b:a', '128k',
-                                    '-ar', '44100',
-                                    '-ac', '2'
-                                ])
-                            else:
-                                ffmpeg_cmd.extend(['-an'])
-                            ffmpeg_cmd.extend([
-                                '-max_muxing_queue_size', '2048',
-                                '-fflags', '+genpts+discardcorrupt+igndts',
-                                '-avoid_negative_ts', 'make_zero',
-                                '-start_at_zero',
-                                '-fps_mode', 'cfr',
-                                '-async', '1',
-                                '-movflags', '+faststart+frag_keyframe',
-                                '-y', file_path
-                            ])
+                            tail = _ROT_CMD_TAIL_AUDIO if has_audio else _ROT_CMD_TAIL_NOAUDIO
+                            ffmpeg_cmd = list(
+                                _ROT_CMD_HEAD + ('-i', rtsp_url_to_use) + _ROT_CMD_VIDEO + tail + ('-y', file_path)
+                            )
                             cmd_str = ' '.join(ffmpeg_cmd)
                             logging.info(f"新規録画FFmpegコマンド: {cmd_str}")
-                            my_env = os.environ.copy()
                             process = subprocess.Popen(
                                 ffmpeg_cmd,
-                                env=my_env,
+                                env=_CHILD_ENV,
                                 stdout=subprocess.PIPE,
                                 stderr=subprocess.PIPE,
+                                close_fds=True,
                                 creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
                             )
                             time.sleep(0.5)  # 起動確認の待機を短縮
                             if process.poll() is None:
                                 logging.info(f"新規録画FFmpeg process started with PID: {process.pid}")
-                                start_time = datetime.now()
-                                recording_processes[camera_id] = {
-                                    'process': process,
-                                    'url': rtsp_url_to_use,
-                                    'file_path': file_path,
-                                    'start_time': start_time,
-                                    'hls': False,
-                                }
-                                recording_start_times[camera_id] = start_time
+                                session = RecordingSession(
+                                    process=process,
+                                    url=rtsp_url_to_use,
+                                    file_path=file_path,
+                                    start_time=datetime.now(),
+                                    hls=False,
+                                    psproc=_ps_process(process.pid),
+                                    has_audio=has_audio,
+                                )
+                                with recording_lock:
+                                    recording_processes[camera_id] = session
                                 if process.stderr:
                                     threading.Thread(
                                         target=monitor_ffmpeg_output,
@@ -420,7 +493,7 @@ def check_recording_duration(camera_id):
                                 continue
                             else:
                                 return_code = process.poll()
-                                error_output = process.stderr.read().decode('utf-8', errors='replace') if process.stderr else ""
+                                error_output = process.stderr.read(65536).decode('utf-8', errors='replace') if process.stderr else ""
                                 logging.error(f"新規録画プロセス起動失敗: 終了コード {return_code}, エラー: {error_output}")
                         except Exception as e:
                             logging.error(f"カメラ {camera_id} の録画再開中にエラーが発生しました: {e}")
@@ -435,7 +508,10 @@ def check_recording_duration(camera_id):
             logging.error(f"カメラ {camera_id} の録画時間監視でエラーが発生しました: {e}")
             logging.exception("詳細なエラー情報:")
             time.sleep(1)  # エラー後は短めに待機
-        time.sleep(CHECK_INTERVAL)
+        stop_event.wait(CHECK_INTERVAL)
+
+    if recording_stop_events.get(camera_id) is stop_event:
+        del recording_stop_events[camera_id]
 
 def monitor_recording_processes():
     """
@@ -455,9 +531,9 @@ def monitor_recording_processes():
             # 既に録画中のカメラのプロセスだけをチェック
             for camera in cameras:
                 camera_id = camera['id']
-                if camera_id in recording_processes:
-                    recording_info = recording_processes[camera_id]
-                    process = recording_info['process']
+                recording_info = recording_processes.get(camera_id)
+                if recording_info is not None:
+                    process = recording_info.process
 
                     # プロセスの状態を確認
                     if process.poll() is not None:  # プロセスが終了している場合
@@ -542,8 +618,8 @@ def start_all_recordings():
         if recording_processes:
             logging.warning("録画プロセスが残っています。FFmpegプロセスを直接強制終了します")
             ffmpeg_utils.kill_ffmpeg_processes(process_type='recording')
-            recording_processes.clear()
-            recording_start_times.clear()
+            with recording_lock:
+                recording_processes.clear()
             time.sleep(2)
     
     logging.info("全カメラの録画を開始します...")
@@ -636,7 +712,8 @@ def stop_all_recordings():
     """
     success = True
     # 現在の録画プロセスのカメラIDリストを保存（反復中に変更されるため）
-    camera_ids = list(recording_processes.keys())
+    with recording_lock:
+        camera_ids = list(recording_processes)
     logging.info(f"停止対象のカメラ: {camera_ids}")
     
     if not camera_ids:
@@ -667,20 +744,16 @@ def stop_all_recordings():
             try:
                 # 録画プロセス情報を取得
                 recording_info = recording_processes.get(camera_id)
-                if recording_info and 'process' in recording_info:
-                    process = recording_info['process']
+                if recording_info and recording_info.process:
+                    process = recording_info.process
                     logging.info(f"カメラ {camera_id} のプロセス(PID: {process.pid})を強制終了します")
                     
                     # 強制的にプロセスを終了
                     ffmpeg_utils.terminate_process(process, timeout=15)  # タイムアウト延長
                     
                     # recording_processesから削除
-                    if camera_id in recording_processes:
-                        del recording_processes[camera_id]
-                    
-                    # 開始時間も削除
-                    if camera_id in recording_start_times:
-                        del recording_start_times[camera_id]
+                    with recording_lock:
+                        recording_processes.pop(camera_id, None)
                     
                     failed_cameras.remove(camera_id)
                     logging.info(f"カメラ {camera_id} のプロセスを強制終了しました")
@@ -691,7 +764,8 @@ def stop_all_recordings():
     
     # 最終確認：全プロセスが停止したか検証
     time.sleep(3)  # プロセスの終了を待機（時間を延長）
-    remaining_processes = list(recording_processes.keys())
+    with recording_lock:
+        remaining_processes = list(recording_processes)
     if remaining_processes:
         logging.critical(f"停止操作後も以下のカメラの録画プロセスが残っています: {remaining_processes}")
         
@@ -702,26 +776,21 @@ def stop_all_recordings():
             # 残っている全プロセスに対して個別に処理
             for camera_id in remaining_processes:
                 try:
-                    if camera_id in recording_processes:
-                        info = recording_processes[camera_id]
-                        if 'process' in info and info['process']:
-                            try:
-                                logging.warning(f"カメラ {camera_id} のプロセスを強制終了します (PID: {info['process'].pid})")
-                                # プロセスが実行中かチェック
-                                if info['process'].poll() is None:
-                                    # まずは標準的な終了を試みる
-                                    info['process'].terminate()
-                                    time.sleep(1)
-                                    # まだ実行中なら強制終了
-                                    if info['process'].poll() is None:
-                                        info['process'].kill()
-                            except Exception as process_err:
-                                logging.error(f"プロセス終了エラー: {process_err}")
-                        
-                        # データから削除
-                        del recording_processes[camera_id]
-                        if camera_id in recording_start_times:
-                            del recording_start_times[camera_id]
+                    with recording_lock:
+                        info = recording_processes.pop(camera_id, None)
+                    if info is not None and info.process:
+                        try:
+                            logging.warning(f"カメラ {camera_id} のプロセスを強制終了します (PID: {info.process.pid})")
+                            # プロセスが実行中かチェック
+                            if info.process.poll() is None:
+                                # まずは標準的な終了を試みる
+                                info.process.terminate()
+                                time.sleep(1)
+                                # まだ実行中なら強制終了
+                                if info.process.poll() is None:
+                                    info.process.kill()
+                        except Exception as process_err:
+                            logging.error(f"プロセス終了エラー: {process_err}")
                 except Exception as proc_err:
                     logging.error(f"カメラ {camera_id} のプロセスクリーンアップエラー: {proc_err}")
             
@@ -730,35 +799,38 @@ def stop_all_recordings():
             time.sleep(1)  # 終了を待機
             
             # recording_processesを完全にクリア
-            recording_processes.clear()
-            recording_start_times.clear()
+            with recording_lock:
+                recording_processes.clear()
             
             logging.info("すべての録画プロセスを強制終了しました")
         except Exception as e:
             logging.error(f"FFmpegプロセスの強制終了中にエラーが発生しました: {e}")
             success = False
     
-    # Windows固有の対策：tasklist経由でFFmpegプロセスの有無を確認
+    # Windows固有の対策：残存するFFmpegプロセスの有無を確認（tasklist/taskkillを起動せずpsutilで直接列挙）
     try:
-        tasklist_output = subprocess.check_output("tasklist /FI \"IMAGENAME eq ffmpeg.exe\"", shell=True).decode('utf-8', errors='ignore')
-        if "ffmpeg.exe" in tasklist_output:
-            logging.warning("tasklist確認: FFmpegプロセスがまだ存在しています")
-            logging.debug(f"tasklist出力: {tasklist_output}")
+        remaining = [p for p in psutil.process_iter(['name']) if (p.info['name'] or '').lower() == 'ffmpeg.exe']
+        if remaining:
+            logging.warning(f"プロセス確認: FFmpegプロセスがまだ存在しています (PID: {[p.pid for p in remaining]})")
             
-            # 強制終了コマンドを実行
-            os.system("taskkill /F /IM ffmpeg.exe /T")
-            time.sleep(1)
+            # 強制終了
+            for p in remaining:
+                try:
+                    p.kill()
+                except psutil.NoSuchProcess:
+                    pass
+            psutil.wait_procs(remaining, timeout=2)
             logging.info("すべてのFFmpegプロセスを強制終了しました")
         else:
-            logging.info("tasklist確認: すべてのFFmpegプロセスが終了しています")
+            logging.info("プロセス確認: すべてのFFmpegプロセスが終了しています")
     except Exception as e:
-        logging.error(f"tasklist/taskkillコマンド実行中にエラーが発生しました: {e}")
+        logging.error(f"FFmpegプロセスの確認・強制終了中にエラーが発生しました: {e}")
     
     # 最終確認：データ構造が空かどうか
-    if recording_processes:
-        logging.warning(f"まだ録画プロセス情報が残っています: {list(recording_processes.keys())}。強制的にクリアします。")
-        recording_processes.clear()
-        recording_start_times.clear()
+    with recording_lock:
+        if recording_processes:
+            logging.warning(f"まだ録画プロセス情報が残っています: {list(recording_processes)}。強制的にクリアします。")
+            recording_processes.clear()
     
     logging.info(f"全カメラ録画停止処理が完了しました。結果: {'成功' if success else '一部失敗'}")
     return success
@@ -774,141 +846,296 @@ def get_recording_status(camera_id):
         bool: 録画中かどうか
     """
     # カメラIDが録画プロセスリストに存在するかチェック
-    is_recording = camera_id in recording_processes
+    recording_info = recording_processes.get(camera_id)
+    if recording_info is None:
+        return False
     
-    if is_recording:
-        # プロセスが生きているか確認
-        process = recording_processes[camera_id]['process']
-        if process.poll() is not None:
-            # プロセスが終了している場合は録画していないとみなす
-            logging.warning(f"Recording process for camera {camera_id} exists but has terminated")
-            return False
-            
-    return is_recording
+    # 状態取得APIが頻繁に呼ばれてもpoll()は1秒に1回までに抑える
+    now = time.monotonic()
+    if now - recording_info.last_poll_ts < 1.0:
+        return recording_info.last_poll_alive
+    
+    # プロセスが生きているか確認
+    alive = recording_info.process.poll() is None
+    recording_info.last_poll_ts = now
+    recording_info.last_poll_alive = alive
+    if not alive:
+        # プロセスが終了している場合は録画していないとみなす
+        logging.warning(f"Recording process for camera {camera_id} exists but has terminated")
+    return alive
+
+def monitor_disk_space():
+    """
+    録画先ボリュームの空き容量を定期的に確認し、結果をフラグとして保持する
+    """
+    global _disk_ok, _disk_free_bytes
+    record_path = os.path.join(config.BASE_PATH, "record")
+    required_space = 1024 * 1024 * 1024 * config.MIN_DISK_SPACE_GB
+    while True:
+        try:
+            fs_utils.ensure_directory_exists(record_path)
+            _disk_free_bytes = fs_utils.get_free_space(record_path)
+            _disk_ok = _disk_free_bytes >= required_space
+            if not _disk_ok:
+                logging.error("Insufficient disk space: %.2f GB available, %s GB required",
+                              _disk_free_bytes / (1024 * 1024 * 1024), config.MIN_DISK_SPACE_GB)
+        except Exception as e:
+            logging.error(f"ディスク容量監視中にエラーが発生しました: {e}")
+        time.sleep(DISK_CHECK_INTERVAL)
+
+# カメラID -> 録画ファイルへの最終書き込みイベント時刻（watchdogが更新）
+_record_last_event = {}
+
+class _RecordFileEventHandler(PatternMatchingEventHandler):
+    """
+    録画フォルダ内のmp4の作成・更新イベントを受けてカメラごとの最終書き込み時刻を記録する
+    """
+    def __init__(self):
+        super().__init__(patterns=["*.mp4"], ignore_directories=True)
+
+    def on_created(self, event):
+        self._touch(event)
 
-def check_disk_space(camera_id):
+    def on_modified(self, event):
+        self._touch(event)
+
+    def _touch(self, event):
+        # record/<カメラID>/<ファイル名> の構成なので親フォルダ名がカメラID
+        camera_id = os.path.basename(os.path.dirname(event.src_path))
+        _record_last_event[camera_id] = time.time()
+
+def _start_record_observer():
+    """
+    録画フォルダの変更通知監視を開始する（Windows: ReadDirectoryChangesW / Linux: inotify）
+
+    Returns:
+        Observer or None: 監視を開始できなかった場合はNone
     """
-    録画に十分なディスク容量があるか確認する
+    if Observer is None:
+        logging.info("[SELF-HEAL] watchdog未導入のため定期スキャンのみで監視します")
+        return None
+    try:
+        # 録画ファイルの書き込み先（BASE_PATH/record/<カメラID>）と同じフォルダを監視する
+        record_path = os.path.join(config.BASE_PATH, "record")
+        fs_utils.ensure_directory_exists(record_path)
+        observer = Observer()
+        observer.daemon = True
+        observer.schedule(_RecordFileEventHandler(), record_path, recursive=True)
+        observer.start()
+        logging.info(f"[SELF-HEAL] 録画フォルダの変更通知監視を開始しました: {record_path}")
+        return observer
+    except Exception as e:
+        logging.error(f"[SELF-HEAL] 録画フォルダの変更通知監視を開始できません。定期スキャンで監視します: {e}")
+        return None
+
+# フォルダパス -> (フォルダのst_mtime_ns, DirEntryのリスト)
+_dir_cache = {}
+
+def _cached_scandir(path):
+    """
+    フォルダ一覧をフォルダ自体の更新時刻をキーにキャッシュして返す
+    ファイルの追加・削除・リネームがなければ再列挙せずstat 1回で済ませる
+
+    Args:
+        path (str): フォルダパス
+
+    Returns:
+        list: os.DirEntryのリスト（各エントリのstat()は初回取得値がキャッシュされる点に注意）
+    """
+    mtime_ns = os.stat(path).st_mtime_ns
+    cached = _dir_cache.get(path)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+    with os.scandir(path) as it:
+        entries = list(it)
+    _dir_cache[path] = (mtime_ns, entries)
+    return entries
+
+# カメラID -> (有効期限, カメラ情報)
+_cam_cache = {}
+CAM_CACHE_TTL = 60  # カメラ情報キャッシュの有効期間（秒）
+
+def _get_camera_cached(camera_id):
+    """
+    自己修復の再起動用にカメラ情報をCAM_CACHE_TTL秒キャッシュして返す
+    """
+    now_ts = time.time()
+    cached = _cam_cache.get(camera_id)
+    if cached and cached[0] > now_ts:
+        return cached[1]
+    cam = camera_utils.get_camera_by_id(camera_id)
+    _cam_cache[camera_id] = (now_ts + CAM_CACHE_TTL, cam)
+    return cam
+
+def _check_recording_files(camera_id, file_path, max_no_update_secs, scan_dir=False):
+    """
+    録画ファイルと録画フォルダの異常を検知する
+    録画中ファイルの鮮度を確認できた場合、フォルダ走査はscan_dir指定時のみ行う
 
     Args:
         camera_id (str): カメラID
+        file_path (str): 録画中のファイルパス
+        max_no_update_secs (int): 許容する最大ファイル無更新時間（秒）
+        scan_dir (bool): 鮮度確認済みでも残存一時ファイル回収のためフォルダを走査するか
 
     Returns:
-        bool: 十分な容量がある場合はTrue
+        tuple: ((異常種別, 対象ファイル) または None, 残存一時ファイルのパスのリスト)
     """
+    now_ts = time.time()
+    # 録画ファイルのstatはこの1回だけ取得して使い回す
     try:
-        camera_dir = os.path.join(config.BASE_PATH, "record", camera_id)
-        fs_utils.ensure_directory_exists(camera_dir)
-        
-        # ディスク空き容量を取得（GB単位）
-        available_gb = fs_utils.get_free_space(camera_dir) / (1024 * 1024 * 1024)
-        logging.info(f"Free space on drive: {available_gb:.2f} GB")
-        logging.info(f"Free space in {camera_dir}: {available_gb:.2f} GB")
-        
-        # 最小必要容量と比較
-        if available_gb < config.MIN_DISK_SPACE_GB:
-            logging.error(f"Insufficient disk space: {available_gb:.2f} GB available, {config.MIN_DISK_SPACE_GB} GB required")
-            return False
-            
-        return True
-    except Exception as e:
-        logging.error(f"ディスク容量チェック中にエラーが発生しました: {str(e)}")
-        return False
+        st = os.stat(file_path) if file_path else None
+    except OSError:
+        st = None
+    # 2. ファイルサイズ・生成間隔監視
+    checked_freshness = False
+    if st is not None:
+        if st.st_size < 1024 * 1024:  # 1MB未満
+            logging.warning("[SELF-HEAL] カメラ%sの録画ファイルが小さすぎます。不完全ファイルとして削除・再録画", camera_id)
+            return ('file_too_small', file_path), []
+        # ファイル更新間隔監視
+        if now_ts - st.st_mtime > max_no_update_secs:
+            logging.error("[SELF-HEAL] カメラ%sの録画ファイルが%s分以上更新されていません。自動修復を試みます", camera_id, max_no_update_secs // 60)
+            return ('file_no_update', file_path), []
+        checked_freshness = True
+    # 録画中ファイルが新しければそれが最新mp4なのでフォルダ走査は不要
+    if checked_freshness and not scan_dir:
+        return None, []
+    # 2.5. ディレクトリ内最新ファイルの生成間隔監視
+    # 最新mp4と残存一時ファイルを1回のscandirでまとめて拾う
+    record_dir = os.path.dirname(file_path) if file_path else None
+    latest_mp4_path = None
+    latest_mtime = -1
+    temp_paths = []
+    if record_dir and os.path.isdir(record_dir):
+        for entry in _cached_scandir(record_dir):
+            name = entry.name
+            if not name.endswith('.mp4'):
+                continue
+            if name.endswith('.temp.mp4'):
+                # 最終化中の一時ファイルは残存ファイルではないので対象外
+                if entry.path not in _finalizing_temp_paths:
+                    temp_paths.append(entry.path)
+                continue
+            if checked_freshness:
+                continue
+            mtime = entry.stat().st_mtime
+            if mtime > latest_mtime:
+                latest_mtime = mtime
+                latest_mp4_path = entry.path
+    if latest_mp4_path:
+        # キャッシュ済みエントリのmtimeは古い可能性があるので最新ファイルだけ取り直す
+        try:
+            latest_mtime = os.stat(latest_mp4_path).st_mtime
+        except FileNotFoundError:
+            latest_mp4_path = None
+    if latest_mp4_path:
+        if now_ts - latest_mtime > max_no_update_secs:
+            logging.error("[SELF-HEAL] カメラ%sの録画ディレクトリ内で最新mp4ファイルが%s分以上生成・更新されていません。自動修復を試みます", camera_id, max_no_update_secs // 60)
+            return ('dir_no_new_mp4', latest_mp4_path), []
+    return None, temp_paths
 
 def self_heal_recording_system():
     """
     録画分割・プロセス・ファイルの異常を自動検知し、恒久修正サイクルを回す自己修復監視関数
+    直近に書き込みイベントがあったカメラはファイル系のチェックを省略し、
+    FULL_SWEEP_INTERVALごとに全カメラを確認する
+    異常を検知したカメラは巡回後にまとめて停止・再起動する
     """
     CHECK_INTERVAL = 60  # 監視間隔（秒）
-    MAX_NO_UPDATE_MINUTES = config.MAX_RECORDING_MINUTES + 2  # 許容する最大ファイル無更新時間
+    FULL_SWEEP_INTERVAL = 300  # 全カメラのファイルを確認する間隔（秒）
+    MAX_NO_UPDATE_SECS = (config.MAX_RECORDING_MINUTES + 2) * 60  # 許容する最大ファイル無更新時間（秒）
     anomaly_counts = {}  # カメラごとの連続異常回数
+    observer = _start_record_observer()
+    last_full_sweep = 0
+    last_temp_sweep = 0
     while True:
+        # 巡回中に届いた起動通知は次の待機をすぐ抜けさせるため、巡回前に消しておく
+        _selfheal_wake.clear()
         try:
-            for camera_id, rec_info in list(recording_processes.items()):
-                proc = rec_info.get('process')
-                file_path = rec_info.get('file_path')
-                last_update = None
-                if file_path and os.path.exists(file_path):
-                    last_update = datetime.fromtimestamp(os.path.getmtime(file_path))
-                now = datetime.now()
+            now_ts = time.time()
+            # 変更通知が使えない場合は毎回全カメラを確認する
+            full_sweep = observer is None or now_ts - last_full_sweep >= FULL_SWEEP_INTERVAL
+            if full_sweep:
+                last_full_sweep = now_ts
+            # 残存一時ファイルの回収は鮮度確認と切り離して低頻度で行う
+            temp_sweep = now_ts - last_temp_sweep >= FULL_SWEEP_INTERVAL
+            if temp_sweep:
+                last_temp_sweep = now_ts
+            with recording_lock:
+                camera_ids = list(recording_processes)
+            to_restart = []
+            for camera_id in camera_ids:
+                # 巡回中に停止されたカメラは飛ばす
+                with recording_lock:
+                    rec_info = recording_processes.get(camera_id)
+                if rec_info is None:
+                    continue
+                proc = rec_info.process
+                # 起動時に取得したpsutil.Processを再利用し、システム全体のPID列挙を避ける
+                psproc = rec_info.psproc
+                temp_paths = []
                 # 1. プロセス生存・ゾンビ化監視
-                if proc is not None:
-                    if proc.poll() is not None or not psutil.pid_exists(proc.pid):
-                        logging.error(f"[SELF-HEAL] カメラ{camera_id}の録画プロセスが異常終了/ゾンビ化。自動修復を試みます")
-                        anomaly_counts[camera_id] = anomaly_counts.get(camera_id, 0) + 1
-                        _dump_anomaly(camera_id, 'process_zombie', file_path)
-                        stop_recording(camera_id)
-                        time.sleep(2)
-                        cam = camera_utils.get_camera_by_id(camera_id)
-                        if cam and cam.get('rtsp_url'):
-                            start_recording(camera_id, cam['rtsp_url'])
-                        continue
-                # 2. ファイルサイズ・生成間隔監視
-                if file_path and os.path.exists(file_path):
-                    file_size = os.path.getsize(file_path)
-                    if file_size < 1024 * 1024:  # 1MB未満
-                        logging.warning(f"[SELF-HEAL] カメラ{camera_id}の録画ファイルが小さすぎます。不完全ファイルとして削除・再録画")
-                        anomaly_counts[camera_id] = anomaly_counts.get(camera_id, 0) + 1
-                        _dump_anomaly(camera_id, 'file_too_small', file_path)
-                        stop_recording(camera_id)
-                        time.sleep(2)
-                        cam = camera_utils.get_camera_by_id(camera_id)
-                        if cam and cam.get('rtsp_url'):
-                            start_recording(camera_id, cam['rtsp_url'])
-                        continue
-                    # ファイル更新間隔監視
-                    if last_update and (now - last_update).total_seconds() > MAX_NO_UPDATE_MINUTES * 60:
-                        logging.error(f"[SELF-HEAL] カメラ{camera_id}の録画ファイルが{MAX_NO_UPDATE_MINUTES}分以上更新されていません。自動修復を試みます")
-                        anomaly_counts[camera_id] = anomaly_counts.get(camera_id, 0) + 1
-                        _dump_anomaly(camera_id, 'file_no_update', file_path)
-                        stop_recording(camera_id)
-                        time.sleep(2)
-                        cam = camera_utils.get_camera_by_id(camera_id)
-                        if cam and cam.get('rtsp_url'):
-                            start_recording(camera_id, cam['rtsp_url'])
-                        continue
-                # 2.5. ディレクトリ内最新ファイルの生成間隔監視
-                record_dir = os.path.dirname(file_path) if file_path else None
-                if record_dir and os.path.exists(record_dir):
-                    mp4_files = [f for f in os.listdir(record_dir) if f.endswith('.mp4') and not f.endswith('.temp.mp4')]
-                    if mp4_files:
-                        latest_mp4 = max(mp4_files, key=lambda f: os.path.getmtime(os.path.join(record_dir, f)))
-                        latest_mp4_path = os.path.join(record_dir, latest_mp4)
-                        latest_mp4_time = datetime.fromtimestamp(os.path.getmtime(latest_mp4_path))
-                        if (now - latest_mp4_time).total_seconds() > MAX_NO_UPDATE_MINUTES * 60:
-                            logging.error(f"[SELF-HEAL] カメラ{camera_id}の録画ディレクトリ内で最新mp4ファイルが{MAX_NO_UPDATE_MINUTES}分以上生成・更新されていません。自動修復を試みます")
-                            anomaly_counts[camera_id] = anomaly_counts.get(camera_id, 0) + 1
-                            _dump_anomaly(camera_id, 'dir_no_new_mp4', latest_mp4_path)
-                            stop_recording(camera_id)
-                            time.sleep(2)
-                            cam = camera_utils.get_camera_by_id(camera_id)
-                            if cam and cam.get('rtsp_url'):
-                                start_recording(camera_id, cam['rtsp_url'])
-                            continue
-                # 3. 一時ファイル残存監視
-                if record_dir and os.path.exists(record_dir):
-                    for fname in os.listdir(record_dir):
-                        if fname.endswith('.temp.mp4'):
-                            temp_path = os.path.join(record_dir, fname)
-                            try:
-                                os.remove(temp_path)
-                                logging.info(f"[SELF-HEAL] 残存一時ファイルを自動削除: {temp_path}")
-                            except Exception as e:
-                                logging.error(f"[SELF-HEAL] 一時ファイル削除失敗: {temp_path}, {e}")
+                if proc is not None and (proc.poll() is not None or (psproc is not None and not psproc.is_running())):
+                    logging.error("[SELF-HEAL] カメラ%sの録画プロセスが異常終了/ゾンビ化。自動修復を試みます", camera_id)
+                    anomaly = ('process_zombie', rec_info.file_path)
+                # 監視間隔内に書き込みイベントがあれば録画は進んでいるのでファイル系チェックは省略
+                # 開始直後の録画はファイルが育っていないのでファイル系チェックの対象外
+                elif now_ts - rec_info.start_time.timestamp() < CHECK_INTERVAL:
+                    continue
+                elif full_sweep or now_ts - _record_last_event.get(camera_id, 0) >= CHECK_INTERVAL:
+                    anomaly, temp_paths = _check_recording_files(camera_id, rec_info.file_path, MAX_NO_UPDATE_SECS, scan_dir=temp_sweep)
+                else:
+                    continue
+                if anomaly is not None:
+                    anomaly_counts[camera_id] = anomaly_counts.get(camera_id, 0) + 1
+                    _dump_anomaly(camera_id, *anomaly)
+                    to_restart.append(camera_id)
+                    continue
+                # 3. 一時ファイル残存監視（ログは件数のみまとめて出す）
+                if temp_paths:
+                    removed = 0
+                    for temp_path in temp_paths:
+                        try:
+                            os.remove(temp_path)
+                            removed += 1
+                            logging.debug("[SELF-HEAL] 残存一時ファイルを自動削除: %s", temp_path)
+                        except OSError as e:
+                            logging.debug("[SELF-HEAL] 一時ファイル削除失敗: %s, %s", temp_path, e)
+                    logging.info("[SELF-HEAL] カメラ%sの残存一時ファイルを%d/%d件削除しました", camera_id, removed, len(temp_paths))
                 # 4. 連続異常発生時のバックオフ・アラート
                 if anomaly_counts.get(camera_id, 0) >= 3:
-                    logging.critical(f"[SELF-HEAL] カメラ{camera_id}で連続異常が3回以上発生。バックオフし管理者に通知してください")
+                    logging.critical("[SELF-HEAL] カメラ%sで連続異常が3回以上発生。バックオフし管理者に通知してください", camera_id)
                     # ここで通知や外部連携処理を追加可能
                     time.sleep(120)  # 2分バックオフ
                     anomaly_counts[camera_id] = 0
+            # 異常カメラをまとめて停止し、待機は1回だけにしてから再起動
+            if to_restart:
+                for camera_id in to_restart:
+                    stop_recording(camera_id)
+                time.sleep(2)
+                for camera_id in to_restart:
+                    cam = _get_camera_cached(camera_id)
+                    if cam and cam.get('rtsp_url'):
+                        start_recording(camera_id, cam['rtsp_url'])
         except Exception as e:
             logging.error(f"[SELF-HEAL] 自己修復監視サイクルで例外: {e}")
-        time.sleep(CHECK_INTERVAL)
+        _selfheal_wake.wait(CHECK_INTERVAL)
+
+# (カメラID, 異常種別) -> 最後にダンプを書き出した時刻
+_last_dump = {}
+DUMP_MIN_INTERVAL = 30  # 同一カメラ・同一異常のダンプ最小間隔（秒）
 
 def _dump_anomaly(camera_id, anomaly_type, file_path):
     """
     異常発生時の詳細ダンプを自動保存
+    再起動ループ時にファイルが量産されないよう、同じ異常はDUMP_MIN_INTERVAL秒に1回まで
     """
+    now_ts = time.time()
+    key = (camera_id, anomaly_type)
+    if now_ts - _last_dump.get(key, 0) < DUMP_MIN_INTERVAL:
+        return
+    _last_dump[key] = now_ts
     try:
         dump_dir = os.path.join(config.BASE_PATH, 'log', 'self_heal')
         os.makedirs(dump_dir, exist_ok=True)
@@ -919,14 +1146,27 @@ def _dump_anomaly(camera_id, anomaly_type, file_path):
             f.write(f"anomaly_type: {anomaly_type}\n")
             f.write(f"file_path: {file_path}\n")
             f.write(f"datetime: {now}\n")
-            if file_path and os.path.exists(file_path):
-                f.write(f"file_size: {os.path.getsize(file_path)}\n")
-                f.write(f"last_update: {datetime.fromtimestamp(os.path.getmtime(file_path))}\n")
-            f.write(f"process_list: {psutil.pids()}\n")
+            try:
+                st = os.stat(file_path) if file_path else None
+            except OSError:
+                st = None
+            if st is not None:
+                f.write(f"file_size: {st.st_size}\n")
+                f.write(f"last_update: {datetime.fromtimestamp(st.st_mtime)}\n")
+            # 全PIDの列挙は重いのでDEBUGログ有効時のみ
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                f.write(f"process_list: {psutil.pids()}\n")
     except Exception as e:
         logging.error(f"[SELF-HEAL] 異常ダンプ保存失敗: {e}")
 
 # 監視スレッドの起動部の直後に追加
+try:
+    disk_monitor_thread = threading.Thread(target=monitor_disk_space, daemon=True)
+    disk_monitor_thread.start()
+    logging.info("Started disk space monitor thread")
+except Exception as e:
+    logging.error(f"Failed to start disk space monitor thread: {e}")
+
 try:
     self_heal_thread = threading.Thread(target=self_heal_recording_system, daemon=True)
     self_heal_thread.start()
@@ -3,30 +3,82 @@
 HLSストリーミングプロセスの管理機能を提供します
 """
 import os
+import re
+import asyncio
+import sys
 import logging
 import threading
 import time
+import select
+import selectors
 import subprocess
+import shutil
 import psutil
-import queue
+import concurrent.futures
+from collections import deque, defaultdict
+from dataclasses import dataclass
 from datetime import datetime
-import traceback
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import PatternMatchingEventHandler
+except ImportError:  # watchdog未導入時はファイルの定期確認で監視する
+    Observer = None
+    PatternMatchingEventHandler = object
 
 import config
 import ffmpeg_utils
 import fs_utils
 import camera_utils
 
+@dataclass(slots=True)
+class StreamState:
+    """
+    ストリーミング中のカメラ1台分の監視データ
+    """
+    last_update: float = 0.0  # HLSファイルの最終更新時刻
+    m3u8_size: int = 0  # m3u8ファイルの前回のサイズ
+    restart_count: int = 0  # ストリーミング再起動回数
+    last_ts_time: float = 0.0  # 最新tsファイルの更新時刻（定期確認時のみ使用）
+    no_update_count: int = 0  # 更新なしが続いた確認回数
+
+@dataclass(slots=True)
+class CameraPaths:
+    """
+    カメラ1台分のHLS出力先のパス（カメラIDとTMP_PATHだけで決まるので一度だけ組み立てる）
+    """
+    tmp_dir: str  # HLS出力フォルダ
+    m3u8: str  # m3u8プレイリスト
+    backup: str  # 起動時に作成するm3u8のバックアップ
+
+@dataclass(slots=True)
+class HealthCheckState:
+    """
+    全体健全性監視（global_health_monitor）でカメラ1台ごとに持つ記録
+    """
+    error_count: int = 0  # プロセス終了を連続で検出した回数
+    last_check: float = 0.0  # m3u8の最終確認時刻（0は未記録）
+
 # グローバル変数としてストリーミングプロセスを管理
+# 書き込みはstreaming_lock内で新しい辞書を作って差し替える（読み出し側はロック・コピー不要）
 streaming_processes = {}
-# HLSファイルの最終更新時間を追跡
-hls_last_update = {}
-# m3u8ファイルの前回のサイズを追跡
-m3u8_last_size = {}
-# ストリーミングキューを追加
-streaming_queue = queue.Queue()
+# カメラID -> StreamState
+stream_states = {}
+# カメラID -> CameraPaths（get_camera_pathsで作成）
+_camera_paths = {}
+# プロセス終了通知（Linux: pidfd + epoll、使えない環境ではNoneとしてprocess.poll()で確認）
+_exit_epoll = select.epoll() if hasattr(select, 'epoll') and hasattr(os, 'pidfd_open') else None
+_exit_pidfds = {}  # カメラID -> pidfd
+_exit_fd_cameras = {}  # pidfd -> カメラID
+_exited_cameras = set()  # 終了通知を受けたカメラID
+# ワーカーごとのストリーミング起動キュー（カメラIDで振り分け、同じカメラは常に同じワーカーが処理）
+_stream_shards = [(deque(), threading.Condition()) for _ in range(max(1, config.MAX_CONCURRENT_STREAMS))]
 # ストリーミング処理のロック
 streaming_lock = threading.Lock()
+# FFmpeg起動の同時実行数と起動間隔の制限
+_spawn_gate = threading.BoundedSemaphore(max(1, config.MAX_SPAWN_PARALLELISM))
+_spawn_lock = threading.Lock()
+_last_spawn_ts = 0.0
+SPAWN_MIN_INTERVAL = 0.1  # FFmpeg起動の最小間隔（秒）
 # 同時ストリーミング数
 active_streams_count = 0
 # ストリーミングワーカーの実行フラグ
@@ -37,8 +89,6 @@ system_resources = {'cpu': 0, 'memory': 0}
 HEALTH_CHECK_INTERVAL = 15  # 監視強化のため短縮→やや緩和
 # ファイル更新タイムアウト（秒）- この時間以上更新がない場合は問題と判断
 HLS_UPDATE_TIMEOUT = 20  # 安定性のため延長
-# ストリーミング再起動回数を記録
-restart_counts = {}
 # ストリーミング再起動の最大回数（これを超えるとより長い時間待機する）
 MAX_RESTART_COUNT = 5
 # ストリーミング再起動後の待機時間（秒）
@@ -60,9 +110,124 @@ RTSP_CONNECTION_TIMEOUT = 15  # 延長
 # カメラプロセスの辞書
 camera_processes = {}
 
+# m3u8プレイリストからtsセグメントのファイル名を取り出すパターン
+_TS_RE = re.compile(rb'([^\r\n/\\]+\.ts)\b')
+# FFmpegの出力行の分類（errorを含む行を優先し、次にframe=...time=の進捗行）
+_FFMPEG_STDERR_RE = re.compile(rb'.*?(?P<err>error)|.*?(?P<progress>frame=.*time=)', re.IGNORECASE)
+
 # --- ウォッチドッグ用グローバル ---
-monitor_threads = {}  # camera_id: thread
+monitor_threads = {}  # camera_id: thread または監視タスク（concurrent.futures.Future）
+# 全カメラの監視タスクを実行するイベントループ（_get_monitor_loopで起動）
+_monitor_loop = None
+_monitor_loop_lock = threading.Lock()
 watchdog_interval = 30  # 秒
+# インポート時のnice値（Linux）。スレッドの優先度はこれを基準にした絶対値で設定する
+# （新しいスレッドは作成元スレッドのnice値を引き継ぐので、現在値からの加算だと下げ幅が重なる）
+_BASE_NICE = os.getpriority(os.PRIO_PROCESS, 0) if hasattr(os, 'getpriority') else 0
+LOWERED_NICE_DELTA = 5  # 監視・クリーンアップ用スレッドのnice値の上乗せ分
+
+def _set_thread_priority(lowered):
+    """
+    呼び出したスレッドの優先度を設定する
+    Windows: THREAD_PRIORITY_BELOW_NORMAL / THREAD_PRIORITY_NORMAL
+    Linux: スレッド単位のnice値を「インポート時の値+LOWERED_NICE_DELTA」/「インポート時の値」に設定
+    （Linuxでnice値を戻すには権限が必要なため、戻せない場合は作成元から引き継いだ値のまま）
+
+    Args:
+        lowered (bool): 下げる場合True、通常に戻す場合False
+    """
+    try:
+        if os.name == 'nt':
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), -1 if lowered else 0)
+        elif hasattr(os, 'setpriority'):
+            # Linuxではnice値はスレッドごとなので、ネイティブスレッドIDを指定する
+            nice = min(19, _BASE_NICE + LOWERED_NICE_DELTA) if lowered else _BASE_NICE
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), nice)
+    except Exception as e:
+        logging.debug(f"スレッド優先度の変更に失敗しました: {e}")
+
+def _lower_thread_priority():
+    """
+    呼び出したスレッドの優先度を下げる（監視・クリーンアップ用スレッドがFFmpegの処理を妨げないようにする）
+    何度呼ばれても、優先度を下げたスレッドから作られたスレッドで呼ばれても下げ幅は同じ
+    """
+    _set_thread_priority(True)
+
+def _restore_thread_priority():
+    """
+    呼び出したスレッドの優先度を通常に戻す（優先度を下げたスレッドから作られるプールのワーカー用）
+    """
+    _set_thread_priority(False)
+
+# 古いセグメントの一括削除用（件数が多い場合は監視スレッドを止めないようバックグラウンドで削除）
+_segment_cleanup_pool = concurrent.futures.ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix="segment-cleanup", initializer=_lower_thread_priority
+)
+SEGMENT_CLEANUP_BACKGROUND_MIN = 8  # この件数を超える削除はバックグラウンドで実行
+# 再起動要求（カメラID -> 実行予定時刻）。同じカメラへの要求はRESTART_DEBOUNCE秒の間まとめて1回にする
+_pending_restarts = {}
+_restarting_cameras = set()  # 再起動処理中のカメラID
+_restart_cond = threading.Condition()
+RESTART_DEBOUNCE = 2.0  # 再起動要求をまとめる時間（秒）
+# 再起動処理用（プロセス停止の待機を含むので、複数カメラの再起動を監視スレッドの外で並行して行う）
+# FFmpegの起動自体はストリーミングワーカーが行うので、起動の同時実行数とは別にワーカー数と揃える
+_restart_pool = concurrent.futures.ThreadPoolExecutor(
+    max_workers=max(1, config.MAX_CONCURRENT_STREAMS), thread_name_prefix="stream-restart"
+)
+# HLS出力フォルダの変更通知監視（Noneの場合はファイルの定期確認で監視）
+_hls_observer = None
+
+class _HlsFileEventHandler(PatternMatchingEventHandler):
+    """
+    TMP_PATH配下のts/m3u8の書き込みイベントを受けてstream_statesの更新時刻・サイズを更新する
+    """
+    def __init__(self):
+        super().__init__(patterns=['*.ts', '*.m3u8'], ignore_directories=True)
+
+    def on_created(self, event):
+        self._touch(event.src_path)
+
+    def on_modified(self, event):
+        self._touch(event.src_path)
+
+    def on_moved(self, event):
+        self._touch(event.dest_path)
+
+    def _touch(self, path):
+        # TMP_PATH/<カメラID>/<ファイル名> の構成なので親フォルダ名がカメラID
+        camera_id = os.path.basename(os.path.dirname(path))
+        state = stream_states.get(camera_id)
+        if state is None:
+            return
+        state.last_update = time.time()
+        if os.path.basename(path) == f"{camera_id}.m3u8":
+            try:
+                state.m3u8_size = os.path.getsize(path)
+            except OSError:
+                pass
+            # 起動直後のm3u8生成待ちがあれば確認させる
+            _ready_watcher.notify()
+
+def _start_hls_observer():
+    """
+    HLS出力フォルダの変更通知監視を開始する（Windows: ReadDirectoryChangesW / Linux: inotify）
+    """
+    global _hls_observer
+    if Observer is None:
+        logging.info("watchdog未導入のためHLSファイルは定期確認で監視します")
+        return
+    try:
+        fs_utils.ensure_directory_exists(config.TMP_PATH)
+        observer = Observer()
+        observer.daemon = True
+        observer.schedule(_HlsFileEventHandler(), config.TMP_PATH, recursive=True)
+        observer.start()
+        _hls_observer = observer
+        logging.info(f"HLS出力フォルダの変更通知監視を開始しました: {config.TMP_PATH}")
+    except Exception as e:
+        logging.error(f"HLS出力フォルダの変更通知監視を開始できません。定期確認で監視します: {e}")
 
 def get_or_start_streaming(camera):
     """
@@ -85,7 +250,7 @@ def get_or_start_streaming(camera):
         return True
     
     # キューに追加して非同期で処理
-    streaming_queue.put(camera)
+    _enqueue_streaming(camera)
     
     # ワーカースレッドがまだ起動していなければ起動
     if not streaming_workers_running:
@@ -94,6 +259,196 @@ def get_or_start_streaming(camera):
     # キューに入れたことを成功として返す
     return True
 
+def get_camera_paths(camera_id):
+    """
+    カメラのHLS出力先パスを取得する（初回のみ組み立ててキャッシュする）
+
+    Args:
+        camera_id (str): カメラID
+
+    Returns:
+        CameraPaths: HLS出力先のパス
+    """
+    paths = _camera_paths.get(camera_id)
+    if paths is None:
+        tmp_dir = os.path.join(config.TMP_PATH, camera_id)
+        paths = CameraPaths(
+            tmp_dir=tmp_dir,
+            m3u8=os.path.join(tmp_dir, f"{camera_id}.m3u8"),
+            backup=os.path.join(tmp_dir, f"{camera_id}_backup.m3u8")
+        )
+        _camera_paths[camera_id] = paths
+    return paths
+
+def _set_stream_process(camera_id, process):
+    """
+    streaming_processesにプロセスを登録する（辞書を作り直して差し替え）
+    新しいカメラの場合はアクティブストリーム数も同じロック内で加算する
+    """
+    global streaming_processes, active_streams_count
+    with streaming_lock:
+        new_processes = dict(streaming_processes)
+        if camera_id not in new_processes:
+            active_streams_count += 1
+        new_processes[camera_id] = process
+        streaming_processes = new_processes
+        _watch_process_exit(camera_id, process)
+
+def _remove_stream(camera_id):
+    """
+    streaming_processesからプロセスを取り除く（辞書を作り直して差し替え）
+    アクティブストリーム数の減算と終了通知の登録解除も同じロック内で行う
+    プロセスの停止はロックの外で呼び出し側が行うこと（streaming_lockを保持したまま呼び出さないこと）
+
+    Returns:
+        subprocess.Popen or None: 取り除いたプロセス。登録されていなければNone
+    """
+    global streaming_processes, active_streams_count
+    with streaming_lock:
+        if camera_id not in streaming_processes:
+            return None
+        new_processes = dict(streaming_processes)
+        process = new_processes.pop(camera_id)
+        streaming_processes = new_processes
+        active_streams_count = max(0, active_streams_count - 1)
+        _unwatch_process_exit(camera_id)
+        return process
+
+def _watch_process_exit(camera_id, process):
+    """
+    プロセスのpidfdをepollに登録して終了通知を受け取れるようにする（streaming_lock内で呼ぶ）
+    """
+    if _exit_epoll is None:
+        return
+    _unwatch_process_exit(camera_id)
+    try:
+        fd = os.pidfd_open(process.pid)
+    except OSError:
+        return
+    _exit_epoll.register(fd, select.EPOLLIN)
+    _exit_pidfds[camera_id] = fd
+    _exit_fd_cameras[fd] = camera_id
+
+def _unwatch_process_exit(camera_id):
+    """
+    プロセスの終了通知の登録を解除してpidfdを閉じる（streaming_lock内で呼ぶ）
+    """
+    _exited_cameras.discard(camera_id)
+    fd = _exit_pidfds.pop(camera_id, None)
+    if fd is None:
+        return
+    _exit_fd_cameras.pop(fd, None)
+    try:
+        _exit_epoll.unregister(fd)
+    except (OSError, ValueError):
+        pass
+    os.close(fd)
+
+def _wait_process_exits(timeout):
+    """
+    最大timeout秒待機する。pidfdが使える場合はプロセスが終了した時点で戻る
+
+    Returns:
+        set or None: 終了通知を受けたカメラIDの集合。pidfdが使えない環境ではNone
+    """
+    if _exit_epoll is None:
+        time.sleep(timeout)
+        return None
+    events = _exit_epoll.poll(timeout)
+    with streaming_lock:
+        for fd, _ in events:
+            camera_id = _exit_fd_cameras.get(fd)
+            if camera_id is None:
+                continue
+            # 終了したpidfdは通知され続けるので登録を外し、終了済みとして記録する
+            try:
+                _exit_epoll.unregister(fd)
+            except (OSError, ValueError):
+                pass
+            _exited_cameras.add(camera_id)
+        return set(_exited_cameras)
+
+def _enqueue_streaming(camera):
+    """
+    カメラIDに対応するワーカーのキューへ起動要求を追加する
+    """
+    items, cond = _stream_shards[hash(camera['id']) % len(_stream_shards)]
+    with cond:
+        items.append(camera)
+        cond.notify()
+
+def _dequeue_streaming(shard_index, timeout):
+    """
+    ワーカー自身のキューから起動要求を取り出す（timeout秒待っても無ければNone）
+    """
+    items, cond = _stream_shards[shard_index]
+    with cond:
+        if not items:
+            cond.wait(timeout)
+        return items.popleft() if items else None
+
+def _request_restart(camera_id):
+    """
+    カメラストリームの再起動を要求する（実際の再起動は_restart_workerが行う）
+    要求済み・再起動中のカメラへの要求は無視する
+
+    Args:
+        camera_id (str): カメラID
+    """
+    with _restart_cond:
+        if camera_id in _pending_restarts or camera_id in _restarting_cameras:
+            return
+        _pending_restarts[camera_id] = time.time() + RESTART_DEBOUNCE
+        _restart_cond.notify()
+
+def _defer_restart(camera_id, delay):
+    """
+    カメラストリームの再起動をdelay秒後に予約する（再起動処理中のカメラからも呼べる）
+
+    Args:
+        camera_id (str): カメラID
+        delay (float): 待機秒数
+    """
+    with _restart_cond:
+        _pending_restarts[camera_id] = max(_pending_restarts.get(camera_id, 0), time.time() + delay)
+        _restart_cond.notify()
+
+def _finish_restart(camera_id):
+    """
+    再起動処理の完了を記録する
+    """
+    with _restart_cond:
+        _restarting_cameras.discard(camera_id)
+        _restart_cond.notify()
+
+def _restart_worker():
+    """
+    実行予定時刻を過ぎた再起動要求をまとめて取り出し、_restart_poolで再起動する
+    """
+    while True:
+        try:
+            with _restart_cond:
+                while True:
+                    now = time.time()
+                    # 再起動処理中のカメラは完了を待つ（冷却後の再起動は処理中に予約される）
+                    waiting = {cid: due_ts for cid, due_ts in _pending_restarts.items() if cid not in _restarting_cameras}
+                    due = [cid for cid, due_ts in waiting.items() if due_ts <= now]
+                    if due:
+                        break
+                    if waiting:
+                        _restart_cond.wait(min(waiting.values()) - now)
+                    else:
+                        _restart_cond.wait()
+                for camera_id in due:
+                    del _pending_restarts[camera_id]
+                    _restarting_cameras.add(camera_id)
+            for camera_id in due:
+                future = _restart_pool.submit(restart_camera_stream, camera_id)
+                future.add_done_callback(lambda _f, cid=camera_id: _finish_restart(cid))
+        except Exception as e:
+            logging.error(f"再起動要求の処理中にエラーが発生しました: {e}")
+            time.sleep(1)
+
 def start_streaming_workers():
     """
     ストリーミングワーカースレッドを開始する
@@ -102,14 +457,19 @@ def start_streaming_workers():
     if streaming_workers_running:
         return
     streaming_workers_running = True
-    # ワーカースレッド数をMAX_CONCURRENT_STREAMSに合わせて動的に生成
-    for i in range(config.MAX_CONCURRENT_STREAMS):
+    # HLSファイルの更新は変更通知で受け取る
+    _start_hls_observer()
+    # ワーカースレッドをキューの数（MAX_CONCURRENT_STREAMS）だけ生成
+    for i in range(len(_stream_shards)):
         worker = threading.Thread(
             target=streaming_worker,
+            args=(i,),
             daemon=True,
             name=f"streaming-worker-{i}"
         )
         worker.start()
+    # 再起動要求を処理するスレッドを開始
+    threading.Thread(target=_restart_worker, daemon=True, name="restart-worker").start()
     # リソース監視スレッドを開始
     resource_monitor = threading.Thread(
         target=monitor_system_resources,
@@ -133,49 +493,55 @@ def start_streaming_workers():
     health_monitor.start()
     logging.info("Streaming workers and monitors started")
 
-def streaming_worker():
+def _wait_spawn_interval():
+    """
+    直前のFFmpeg起動からSPAWN_MIN_INTERVAL秒経つまで待機する
+    """
+    global _last_spawn_ts
+    with _spawn_lock:
+        elapsed = time.time() - _last_spawn_ts
+        if elapsed < SPAWN_MIN_INTERVAL:
+            time.sleep(SPAWN_MIN_INTERVAL - elapsed)
+        _last_spawn_ts = time.time()
+
+def streaming_worker(shard_index):
     """
     ストリーミングリクエストを処理するワーカー
+
+    Args:
+        shard_index (int): 担当するキューの番号
     """
-    global active_streams_count
-    
     while True:
         try:
-            camera = streaming_queue.get(timeout=1)
+            camera = _dequeue_streaming(shard_index, timeout=1)
+            if camera is None:
+                continue
             if camera['id'] in streaming_processes:
-                streaming_queue.task_done()
                 continue
             cpu_usage = system_resources['cpu']
             mem_usage = system_resources['memory']
-            with streaming_lock:
-                current_streams = active_streams_count
+            # 起動中のストリーム数は辞書の件数で判定（ロック不要）
+            current_streams = len(streaming_processes)
             if current_streams >= config.MAX_CONCURRENT_STREAMS:
                 logging.warning(f"Maximum concurrent streams limit reached ({current_streams}/{config.MAX_CONCURRENT_STREAMS}). Delaying stream for camera {camera['id']}")
-                streaming_queue.put(camera)
-                streaming_queue.task_done()
+                _enqueue_streaming(camera)
                 time.sleep(5)
                 continue
             if cpu_usage > config.MAX_CPU_PERCENT or mem_usage > config.MAX_MEM_PERCENT:
                 logging.warning(f"System resources critical: CPU {cpu_usage}%, Memory {mem_usage}%. Delaying stream for camera {camera['id']}")
-                streaming_queue.put(camera)
-                streaming_queue.task_done()
+                _enqueue_streaming(camera)
                 time.sleep(10)
                 continue
-            # プロセス起動前にディレイを追加
-            time.sleep(1)
+            # FFmpegの同時起動数と起動間隔はstart_streaming_process内のプロセス起動部分だけで制限する
             success = start_streaming_process(camera)
-            with streaming_lock:
-                if success:
-                    active_streams_count += 1
-                    logging.info(f"Successfully started streaming for camera {camera['id']}. Active streams: {active_streams_count}")
-                else:
-                    logging.error(f"Failed to start streaming for camera {camera['id']}")
+            # アクティブストリーム数はstreaming_processesへの登録時に加算済み
+            if success:
+                logging.info(f"Successfully started streaming for camera {camera['id']}. Active streams: {active_streams_count}")
+            else:
+                logging.error(f"Failed to start streaming for camera {camera['id']}")
             if not success:
                 time.sleep(10)
-                streaming_queue.put(camera)
-            streaming_queue.task_done()
-        except queue.Empty:
-            time.sleep(0.5)
+                _enqueue_streaming(camera)
         except Exception as e:
             logging.error(f"Error in streaming worker: {e}")
             time.sleep(1)
@@ -191,7 +557,8 @@ def start_streaming_process(camera):
         bool: 操作が成功したかどうか
     """
     try:
-        camera_tmp_dir = os.path.join(config.TMP_PATH, camera['id'])
+        paths = get_camera_paths(camera['id'])
+        camera_tmp_dir = paths.tmp_dir
         fs_utils.ensure_directory_exists(camera_tmp_dir)
 
         # logディレクトリの存在確認（なければ作成）
@@ -200,24 +567,14 @@ def start_streaming_process(camera):
         timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
         log_path = os.path.join(log_dir, f"hls_{camera['id']}_{timestamp}.log").replace('/', '\\')
 
-        hls_path = os.path.join(camera_tmp_dir, f"{camera['id']}.m3u8").replace('/', '\\')
+        hls_path = paths.m3u8.replace('/', '\\')
 
         # カメラ固有のプロセスのみ終了（より高速な起動のため）
         ffmpeg_utils.kill_ffmpeg_processes(camera_id=camera['id'], process_type='hls')
         time.sleep(0.5)  # プロセス終了を待つ時間を増加
 
-        # カメラIDディレクトリが存在しない場合のみ作成
-        if not os.path.exists(camera_tmp_dir):
-            os.makedirs(camera_tmp_dir, exist_ok=True)
-            logging.info(f"カメラディレクトリを作成しました: {camera_tmp_dir}")
-
         # RTSP URLのデバッグ出力 (認証情報は隠す)
-        safe_rtsp_url = camera['rtsp_url']
-        if "@" in safe_rtsp_url:
-            # 認証情報を隠す
-            parts = safe_rtsp_url.split("@", 1)
-            protocol_auth = parts[0].split("://", 1)
-            safe_rtsp_url = f"{protocol_auth[0]}://***:***@{parts[1]}"
+        safe_rtsp_url = camera.get('_safe_rtsp_url') or camera_utils.mask_rtsp_url(camera['rtsp_url'])
         logging.info(f"カメラ {camera['id']} のRTSP URL: {safe_rtsp_url}")
         
         # 共通のセグメント時間とバッファサイズ（すべてのカメラに統一）
@@ -233,15 +590,8 @@ def start_streaming_process(camera):
         )
 
         # FFmpegコマンドのデバッグ出力 (認証情報は隠す)
-        debug_cmd = ffmpeg_cmd.copy()
-        for i, arg in enumerate(debug_cmd):
-            if arg == '-i' and i+1 < len(debug_cmd) and '@' in debug_cmd[i+1]:
-                parts = debug_cmd[i+1].split('@')
-                protocol_auth = parts[0].split('://')
-                debug_cmd[i+1] = f"{protocol_auth[0]}://***:***@{parts[1]}"
-                
-        # コマンドの出力
-        logging.info(f"FFmpeg command: {' '.join(debug_cmd)}")
+        debug_cmd = ' '.join(ffmpeg_cmd).replace(camera['rtsp_url'], safe_rtsp_url)
+        logging.info(f"FFmpeg command: {debug_cmd}")
 
         # 既存のTSファイルをクリアして新鮮な状態で開始
         try:
@@ -255,12 +605,15 @@ def start_streaming_process(camera):
             logging.warning(f"TSファイルのクリーンアップに失敗: {e}")
 
         # FFmpegプロセスを最高優先度で開始（独立ログファイルを使用）
-        process = ffmpeg_utils.start_ffmpeg_process(
-            ffmpeg_cmd, 
-            log_path=log_path,  # カメラごとに独立したログファイル
-            high_priority=True,  # 高優先度で実行
-            show_error=True  # エラー出力を詳細に表示
-        )
+        # 同時起動数を制限し、起動間隔を最小限空ける（起動後の確認や待機中はゲートを保持しない）
+        with _spawn_gate:
+            _wait_spawn_interval()
+            process = ffmpeg_utils.start_ffmpeg_process(
+                ffmpeg_cmd, 
+                log_path=log_path,  # カメラごとに独立したログファイル
+                high_priority=True,  # 高優先度で実行
+                show_error=True  # エラー出力を詳細に表示
+            )
         
         # プロセスの状態を確認（短時間で）
         time.sleep(1.0)  # プロセスの起動を待つ時間を延長
@@ -293,102 +646,188 @@ def start_streaming_process(camera):
             cleanup_camera_resources(camera['id'])
             return False
 
-        # プロセス情報を設定
-        streaming_processes[camera['id']] = process
-        
-        # 初期化時点で更新情報を記録
-        hls_last_update[camera['id']] = time.time()
-        if os.path.exists(hls_path):
-            m3u8_last_size[camera['id']] = os.path.getsize(hls_path)
-        else:
-            m3u8_last_size[camera['id']] = 0
+        # 初期化時点で更新情報を記録（再起動カウンターもリセット）
+        try:
+            m3u8_size = os.stat(hls_path).st_size
+        except OSError:
+            m3u8_size = 0
+        stream_states[camera['id']] = StreamState(last_update=time.time(), m3u8_size=m3u8_size)
 
-        # 再起動カウンターの初期化/リセット
-        restart_counts[camera['id']] = 0
+        # プロセス情報を設定
+        _set_stream_process(camera['id'], process)
 
-        # m3u8ファイルの生成を待機（タイムアウト延長）
-        m3u8_created = False
-        max_wait_time = 30  # 最大待機時間を30秒に延長
-        start_wait_time = time.time()
-        wait_interval = 0.1  # 確認間隔をさらに短く
-        
+        # m3u8ファイルの生成は共有の待機スレッドで確認し、ワーカーはすぐに次の要求へ戻る
         logging.info(f"カメラ {camera['id']} のm3u8ファイル生成を待機中...")
-        while time.time() - start_wait_time < max_wait_time:
-            # プロセスが終了していないか確認
-            if process.poll() is not None:
-                return_code = process.poll()
-                error_output = ""
-                try:
-                    if process.stderr:
-                        # stderr全量を読み込む
-                        error_output = process.stderr.read().decode('utf-8', errors='replace')
-                    if not error_output and os.path.exists(log_path):
-                        with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
-                            error_output = f.read()
-                except Exception as err:
-                    logging.error(f"エラー出力の読み取りに失敗: {err}")
-                    error_output = "エラー出力の取得に失敗しました"
-                
-                logging.error(f"m3u8待機中にFFmpegプロセスが終了しました。終了コード: {return_code}")
-                logging.error(f"FFmpegエラー出力: {error_output}")
-                if camera['id'] in streaming_processes:
-                    del streaming_processes[camera['id']]
-                return False
-            
-            # ファイル存在チェック
-            if os.path.exists(hls_path):
-                try:
-                    m3u8_size = os.path.getsize(hls_path)
-                    if m3u8_size > 0:
-                        with open(hls_path, 'r') as f:
-                            content = f.read()
-                        
-                        # m3u8の内容が有効か確認
-                        if "#EXTM3U" in content:
-                            # TSファイルが作成されるまで待機
-                            ts_files = [f for f in os.listdir(camera_tmp_dir) if f.endswith('.ts')]
-                            if ts_files:
-                                m3u8_created = True
-                                time_taken = time.time() - start_wait_time
-                                logging.info(f"カメラ {camera['id']} のHLSプレイリストとTSファイルが {time_taken:.1f}秒後に作成されました")
-                                # ファイルを確実に更新するために一度コピーを作成
-                                with open(hls_path, 'r') as src:
-                                    m3u8_content = src.read()
-                                # 一時的なバックアップファイルを作成（異常時の回復用）
-                                backup_path = os.path.join(camera_tmp_dir, f"{camera['id']}_backup.m3u8")
-                                with open(backup_path, 'w') as dst:
-                                    dst.write(m3u8_content)
-                                logging.info(f"カメラ {camera['id']} のm3u8バックアップファイルを作成しました")
-                                break
-                except Exception as e:
-                    logging.warning(f"m3u8ファイル確認中にエラー: {e}")
-            
-            time.sleep(wait_interval)
-        
-        # TSファイルがまだなくても短時間でプロセスを開始（監視スレッドが後で確認）
-        if not m3u8_created and time.time() - start_wait_time >= 5:
-            logging.warning(f"カメラ {camera['id']} のHLSプレイリストファイルが時間内に作成されませんでした。監視スレッドで確認を続けます")
-        
-        # 監視スレッドを開始
-        monitor_thread = threading.Thread(
-            target=monitor_hls_updates,
-            args=(camera['id'],),
-            daemon=True,
-            name=f"hls-monitor-{camera['id']}"
+        start_wait_time = time.time()
+        _ready_watcher.wait_for(
+            camera_tmp_dir,
+            f"{camera['id']}.m3u8",
+            timeout=HLS_CREATION_TIMEOUT,
+            callback=lambda status: _on_stream_ready(camera, process, log_path, start_wait_time, status),
+            process=process
         )
-        monitor_threads[camera['id']] = monitor_thread
-        monitor_thread.start()
 
         logging.info(f"カメラ {camera['id']} のストリーミングプロセスを正常に開始しました")
         return True
 
     except Exception as e:
-        error_traceback = traceback.format_exc()
-        logging.error(f"カメラ {camera['id']} のストリーミングプロセス開始中にエラーが発生: {e}")
-        logging.error(f"詳細なエラー情報: {error_traceback}")
+        logging.exception(f"カメラ {camera['id']} のストリーミングプロセス開始中にエラーが発生: {e}")
         cleanup_camera_resources(camera['id'])
         return False
 
+def _hls_playlist_ready(camera_tmp_dir, m3u8_path):
+    """
+    m3u8が有効な内容で作成され、tsファイルも出力されているかを確認する
+    """
+    try:
+        # m3u8は必ず#EXTM3Uで始まるので先頭7バイトだけ確認する（空ファイルもここで弾かれる）
+        with open(m3u8_path, 'rb') as f:
+            if f.read(7) != b'#EXTM3U':
+                return False
+        return bool(_scan_ts_files(camera_tmp_dir))
+    except OSError:
+        return False
+
+# m3u8生成待ちの結果処理用（クリーンアップやコピーで待機スレッドの監視を止めないよう別スレッドで実行）
+# ワーカーは優先度を下げた待機スレッドから作られるので、起動時に通常の優先度へ戻す
+_ready_callback_pool = concurrent.futures.ThreadPoolExecutor(
+    max_workers=4, thread_name_prefix="hls-ready-callback", initializer=_restore_thread_priority
+)
+
+def _run_ready_callback(callback, status, m3u8_path):
+    """
+    m3u8生成待ちの結果をコールバックに渡す（_ready_callback_pool上で実行）
+    """
+    try:
+        callback(status)
+    except Exception as e:
+        logging.error(f"m3u8生成待ちの結果処理中にエラーが発生しました: {m3u8_path}, {e}")
+
+class _ReadyWatcher:
+    """
+    起動直後のm3u8生成待ちを1本のスレッドでまとめて監視する
+    変更通知が有効ならm3u8の書き込みイベントで起床し、無効なら短い間隔で待機中の全カメラを確認する
+    """
+    POLL_INTERVAL = 0.5  # 変更通知が無い場合の確認間隔（秒）
+    EVENT_POLL_INTERVAL = 2.0  # 変更通知がある場合もプロセス終了とタイムアウトはこの間隔で確認
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._waits = {}  # m3u8パス -> (フォルダ, 期限, プロセス, コールバック)
+        self._thread = None
+
+    def wait_for(self, camera_tmp_dir, m3u8_name, timeout, callback, process=None):
+        """
+        m3u8の生成待ちを登録する。結果はcallback('ready' / 'timeout' / 'failed')で通知する
+
+        Args:
+            camera_tmp_dir (str): HLS出力フォルダ
+            m3u8_name (str): 待機するm3u8のファイル名
+            timeout (float): 待機する最大秒数
+            callback (callable): 結果を受け取る関数（_ready_callback_pool上で呼ばれる）
+            process (subprocess.Popen, optional): 終了したら'failed'とするFFmpegプロセス
+        """
+        m3u8_path = os.path.join(camera_tmp_dir, m3u8_name)
+        with self._cond:
+            self._waits[m3u8_path] = (camera_tmp_dir, time.time() + timeout, process, callback)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="hls-ready-watcher")
+                self._thread.start()
+            self._cond.notify()
+
+    def notify(self):
+        """
+        m3u8の書き込みイベントを受けて待機スレッドを起床させる
+        """
+        if self._waits:
+            with self._cond:
+                self._cond.notify()
+
+    def _run(self):
+        _lower_thread_priority()
+        while True:
+            with self._cond:
+                while not self._waits:
+                    self._cond.wait()
+                self._cond.wait(self.POLL_INTERVAL if _hls_observer is None else self.EVENT_POLL_INTERVAL)
+                waits = list(self._waits.items())
+            now = time.time()
+            for m3u8_path, entry in waits:
+                camera_tmp_dir, deadline, process, callback = entry
+                if process is not None and process.poll() is not None:
+                    status = 'failed'
+                elif _hls_playlist_ready(camera_tmp_dir, m3u8_path):
+                    status = 'ready'
+                elif now >= deadline:
+                    status = 'timeout'
+                else:
+                    continue
+                with self._cond:
+                    # 確認中に同じカメラが再登録されていればこの結果は捨てる
+                    if self._waits.get(m3u8_path) is not entry:
+                        continue
+                    del self._waits[m3u8_path]
+                # 待機スレッドは判定だけ行い、結果処理はプールに任せる
+                _ready_callback_pool.submit(_run_ready_callback, callback, status, m3u8_path)
+
+_ready_watcher = _ReadyWatcher()
+
+def _on_stream_ready(camera, process, log_path, start_wait_time, status):
+    """
+    m3u8生成待ちの結果を受けて起動後の処理を行う
+
+    Args:
+        camera (dict): カメラ情報
+        process (subprocess.Popen): 起動したFFmpegプロセス
+        log_path (str): FFmpegのログファイル
+        start_wait_time (float): 待機を開始した時刻
+        status (str): 'ready' / 'timeout' / 'failed'
+    """
+    camera_id = camera['id']
+    # 待機中に停止・再起動されたプロセスの結果は無視する
+    if streaming_processes.get(camera_id) is not process:
+        return
+
+    if status == 'failed':
+        return_code = process.poll()
+        error_output = ""
+        try:
+            if process.stderr:
+                # stderr全量を読み込む
+                error_output = process.stderr.read().decode('utf-8', errors='replace')
+            if not error_output and os.path.exists(log_path):
+                with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+                    error_output = f.read()
+        except Exception as err:
+            logging.error(f"エラー出力の読み取りに失敗: {err}")
+            error_output = "エラー出力の取得に失敗しました"
+
+        logging.error(f"m3u8待機中にFFmpegプロセスが終了しました。終了コード: {return_code}")
+        logging.error(f"FFmpegエラー出力: {error_output}")
+        cleanup_camera_resources(camera_id)
+        # ワーカーと同じく10秒後に再度キューへ入れる
+        retry = threading.Timer(10, _enqueue_streaming, args=(camera,))
+        retry.daemon = True
+        retry.start()
+        return
+
+    if status == 'ready':
+        paths = get_camera_paths(camera_id)
+        logging.info(f"カメラ {camera_id} のHLSプレイリストとTSファイルが {time.time() - start_wait_time:.1f}秒後に作成されました")
+        try:
+            # 一時的なバックアップファイルを作成（異常時の回復用）
+            # FFmpegはm3u8を上書きするのでハードリンクではなくOSのコピー機能で複製する
+            shutil.copyfile(paths.m3u8, paths.backup)
+            logging.info(f"カメラ {camera_id} のm3u8バックアップファイルを作成しました")
+        except Exception as e:
+            logging.warning(f"m3u8ファイル確認中にエラー: {e}")
+    else:
+        # TSファイルがまだなくても監視スレッドで確認を続ける
+        logging.warning(f"カメラ {camera_id} のHLSプレイリストファイルが時間内に作成されませんでした。監視スレッドで確認を続けます")
+
+    # 監視スレッドを開始
+    _start_monitor(camera_id, process)
+
 def restart_streaming(camera_id):
     """
     ストリーミングプロセスを再起動
@@ -399,15 +838,12 @@ def restart_streaming(camera_id):
     Returns:
         bool: 操作が成功したかどうか
     """
-    global active_streams_count, restart_counts
-    
     try:
         # 再起動回数のインクリメント
-        if camera_id not in restart_counts:
-            restart_counts[camera_id] = 0
-        restart_counts[camera_id] += 1
+        state = stream_states.setdefault(camera_id, StreamState())
+        state.restart_count += 1
         
-        current_restart_count = restart_counts[camera_id]
+        current_restart_count = state.restart_count
         
         # 再起動回数に基づいて待機時間を計算
         if current_restart_count > MAX_RESTART_COUNT:
@@ -419,15 +855,10 @@ def restart_streaming(camera_id):
         logging.info(f"Restarting streaming for camera {camera_id} (restart #{current_restart_count})")
         
         # 既存のプロセスを強制終了
-        if camera_id in streaming_processes:
+        process = _remove_stream(camera_id)
+        if process is not None:
             try:
-                process = streaming_processes[camera_id]
                 ffmpeg_utils.terminate_process(process)
-                del streaming_processes[camera_id]
-                
-                with streaming_lock:
-                    active_streams_count = max(0, active_streams_count - 1)
-                
                 logging.info(f"Terminated existing streaming process for camera {camera_id}")
             except Exception as term_error:
                 logging.error(f"Error terminating process for camera {camera_id}: {term_error}")
@@ -448,198 +879,175 @@ def restart_streaming(camera_id):
         logging.error(f"Error restarting streaming for camera {camera_id}: {e}")
         return False
 
-def monitor_streaming_process(camera_id, process):
+def _get_monitor_loop():
+    """
+    全カメラの監視を実行するイベントループを取得する（初回呼び出し時に専用スレッドで起動）
+    """
+    global _monitor_loop
+    with _monitor_loop_lock:
+        if _monitor_loop is None:
+            loop = asyncio.new_event_loop()
+            # ファイル確認や再起動を実行するスレッドプールも優先度を下げて作成
+            loop.set_default_executor(concurrent.futures.ThreadPoolExecutor(
+                thread_name_prefix="stream-monitor", initializer=_lower_thread_priority
+            ))
+            threading.Thread(target=_run_monitor_loop, args=(loop,), daemon=True, name="stream-monitor-loop").start()
+            _monitor_loop = loop
+        return _monitor_loop
+
+def _run_monitor_loop(loop):
+    """
+    監視用イベントループを優先度を下げて実行する
+    """
+    _lower_thread_priority()
+    loop.run_forever()
+
+def _start_monitor(camera_id, process):
+    """
+    カメラの監視タスクを監視用イベントループに登録してmonitor_threadsに記録する
+    """
+    monitor_threads[camera_id] = asyncio.run_coroutine_threadsafe(
+        monitor_streaming_process(camera_id, process), _get_monitor_loop()
+    )
+
+def _is_monitor_alive(monitor):
+    """
+    monitor_threadsの要素（スレッドまたは監視タスク）が動作中かどうか
+    """
+    if isinstance(monitor, threading.Thread):
+        return monitor.is_alive()
+    return not monitor.done()
+
+async def monitor_streaming_process(camera_id, process):
     """
     ストリーミングプロセスの健全性をモニタリングする関数
+    プロセスの生存確認とHLSファイルの更新確認を同じ周期で行う
+    全カメラ分が1つのイベントループ上で動き、ファイル確認や再起動などの待ちが発生する処理はスレッドプールで実行する
 
     Args:
         camera_id (str): カメラID
         process (subprocess.Popen): 監視するプロセス
     """
-    global active_streams_count
-    
+    loop = asyncio.get_running_loop()
     logging.info(f"カメラ {camera_id} のHLS監視スレッドを開始しました")
     
     try:
-        while camera_id in streaming_processes:
+        # 停止・再起動で別のプロセスに入れ替わったら終了
+        while streaming_processes.get(camera_id) is process:
             try:
-                # プロセスがまだ実行中かチェック
-                if process.poll() is not None:
+                status = await loop.run_in_executor(None, _check_health, camera_id, process)
+                if status == 'exited':
                     logging.warning(f"カメラ {camera_id} のストリーミングプロセスが終了しました (返却コード: {process.returncode})")
                     # クリーンアップして再起動準備
-                    cleanup_camera_resources(camera_id)
+                    await loop.run_in_executor(None, cleanup_camera_resources, camera_id)
                     
                     # すべてのカメラに共通の再起動遅延を設定
                     restart_delay = RESTART_COOLDOWN
                     logging.info(f"カメラ {camera_id} に対して再起動遅延を適用します: {restart_delay}秒")
                     
                     # 少し待ってから再起動を試みる
-                    time.sleep(restart_delay)
+                    await asyncio.sleep(restart_delay)
                     
-                    # 再起動をキューに入れる
-                    restart_camera_stream(camera_id)
-                    break
-                
-                # HLSファイルの更新チェック
-                if not check_hls_file_health(camera_id):
-                    # ファイルが更新されていない場合、次のチェックまで待機
-                    wait_time = STREAMING_CHECK_INTERVAL
-                    
-                    time.sleep(wait_time)
-                    continue
+                    # 再起動を要求する
+                    _request_restart(camera_id)
+                    return
+                if status == 'stalled':
+                    state = stream_states.get(camera_id)
+                    elapsed = time.time() - state.last_update if state else 0
+                    logging.warning(f"カメラ {camera_id} で問題を検出: HLSファイルが {round(elapsed, 1)}秒間更新されていません（2回連続未更新）")
+                    logging.warning(f"カメラ {camera_id} の問題が検出されたため、ストリームを即座に再起動します")
+                    _request_restart(camera_id)
+                    return
                 
                 # 一定間隔待機
-                time.sleep(STREAMING_CHECK_INTERVAL)
+                await asyncio.sleep(STREAMING_CHECK_INTERVAL)
                 
             except Exception as e:
                 logging.error(f"カメラ {camera_id} の監視中にエラーが発生しました: {e}")
-                time.sleep(STREAMING_CHECK_INTERVAL)
+                await asyncio.sleep(STREAMING_CHECK_INTERVAL)
     
     except Exception as e:
         logging.error(f"カメラ {camera_id} の監視スレッドでエラーが発生しました: {e}")
+        # 監視できなくなったプロセスは停止して再ストリーミングができるようにする
+        if streaming_processes.get(camera_id) is process:
+            await loop.run_in_executor(None, cleanup_camera_resources, camera_id)
     
     finally:
         logging.info(f"カメラ {camera_id} の監視スレッドを終了しました")
-        # もしプロセスがまだ終了していなければ終了させる
-        try:
-            if camera_id in streaming_processes and process.poll() is None:
-                process.terminate()
-                try:
-                    process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    process.kill()
-        except:
-            pass
-        # ストリーミングプロセスをクリーンアップして再ストリーミングができるようにする
-        cleanup_camera_resources(camera_id)
 
-def check_hls_file_health(camera_id):
+def _check_health(camera_id, process):
     """
-    HLSファイルの健全性をチェック
+    プロセスの生存とHLSファイルの更新をまとめて確認する
+
+    Args:
+        camera_id (str): カメラID
+        process (subprocess.Popen): 監視するプロセス
+
+    Returns:
+        str: 'ok' / 'exited'（プロセス終了） / 'stalled'（2回連続で更新なし）
     """
-    try:
-        camera_tmp_dir = os.path.join(config.TMP_PATH, str(camera_id))
-        m3u8_path = os.path.join(camera_tmp_dir, f"{camera_id}.m3u8")
-        
-        if not os.path.exists(m3u8_path):
-            return False
-            
-        # ファイルの更新時刻をチェック
-        current_time = time.time()
-        mod_time = os.path.getmtime(m3u8_path)
-        
-        if current_time - mod_time > HLS_UPDATE_TIMEOUT:  # 3秒以上更新がない
-            return False
-            
-        # ファイルサイズをチェック
-        size = os.path.getsize(m3u8_path)
-        if size < 100:  # ファイルが小さすぎる
-            return False
-            
-        # TSファイルの存在確認
-        with open(m3u8_path, 'r') as f:
-            content = f.read()
-            if '.ts' not in content:
-                return False
-        
-        # カメラディレクトリ内のtsファイルをチェック
-        ts_files = [f for f in os.listdir(camera_tmp_dir) if f.endswith('.ts')]
-        if not ts_files:
-            return False
-            
-        # 最新のTSファイルの更新時刻をチェック
-        latest_ts = max(ts_files, key=lambda f: os.path.getmtime(os.path.join(camera_tmp_dir, f)))
-        latest_ts_path = os.path.join(camera_tmp_dir, latest_ts)
-        latest_ts_mtime = os.path.getmtime(latest_ts_path)
-        
-        # 最新のTSファイルが3秒以上更新されていないかチェック
-        if current_time - latest_ts_mtime > HLS_UPDATE_TIMEOUT:
-            return False
-            
-        return True
-        
-    except Exception as e:
-        logging.error(f"HLSファイルの健全性チェック中にエラーが発生しました: {e}")
-        return False
+    if process.poll() is not None:
+        return 'exited'
+
+    state = stream_states.get(camera_id)
+    if state is None:
+        state = stream_states.setdefault(camera_id, StreamState(last_update=time.time()))
+
+    # 変更通知が無効な場合はフォルダを1回走査して更新を検出する
+    if _hls_observer is None:
+        _poll_hls_files(camera_id, state)
 
-def monitor_hls_updates(camera_id):
+    if time.time() - state.last_update <= MAX_UPDATE_WAIT_TIME:
+        state.no_update_count = 0
+        return 'ok'
+    state.no_update_count += 1
+    return 'stalled' if state.no_update_count >= 2 else 'ok'
+
+def _poll_hls_files(camera_id, state):
     """
-    HLSファイルの更新を監視するスレッド
+    1回のscandirでm3u8のサイズと最新tsの更新時刻を取得し、変化があればstateの更新時刻を進める
 
     Args:
-        camera_id (str): 監視するカメラID
+        camera_id (str): カメラID
+        state (StreamState): カメラの監視データ
     """
+    paths = get_camera_paths(camera_id)
+    m3u8_name = os.path.basename(paths.m3u8)
+    m3u8_size = None
+    latest_ts_time = 0.0
     try:
-        logging.info(f"カメラ {camera_id} のHLS監視スレッドを開始しました")
-        
-        # 初期化
-        last_check_time = time.time()
-        last_m3u8_size = 0
-        last_ts_time = 0
-        last_update_time = time.time()
-        consecutive_no_updates = 0
-        
-        while camera_id in streaming_processes:
-            try:
-                current_time = time.time()
-                # 監視間隔ごとにチェック
-                if current_time - last_check_time >= STREAMING_CHECK_INTERVAL:
-                    last_check_time = current_time
-                    
-                    # M3U8ファイルの確認
-                    camera_tmp_dir = os.path.join(config.TMP_PATH, camera_id)
-                    m3u8_path = os.path.join(camera_tmp_dir, f"{camera_id}.m3u8")
-                    
-                    if os.path.exists(m3u8_path):
-                        # M3U8ファイルのサイズをチェック
-                        current_m3u8_size = os.path.getsize(m3u8_path)
-                        
-                        # TSファイルのチェック
-                        ts_files = [f for f in os.listdir(camera_tmp_dir) if f.endswith('.ts')]
-                        ts_files_exist = len(ts_files) > 0
-                        
-                        if ts_files_exist:
-                            # 最新のTSファイルの更新時間を取得
-                            latest_ts = sorted(
-                                [os.path.join(camera_tmp_dir, f) for f in ts_files],
-                                key=os.path.getmtime, 
-                                reverse=True
-                            )[0]
-                            current_ts_time = os.path.getmtime(latest_ts)
-                            
-                            # 更新ありと判断するケース
-                            if current_m3u8_size != last_m3u8_size or current_ts_time > last_ts_time:
-                                last_update_time = current_time
-                                last_m3u8_size = current_m3u8_size
-                                last_ts_time = current_ts_time
-                                consecutive_no_updates = 0
-                            else:
-                                # 更新なしのカウント
-                                consecutive_no_updates += 1
-                                
-                                # 2回連続で未更新かつMAX_UPDATE_WAIT_TIME超過で再起動
-                                if consecutive_no_updates >= 2 and current_time - last_update_time > MAX_UPDATE_WAIT_TIME:
-                                    logging.warning(f"カメラ {camera_id} で問題を検出: TSファイルが {round(current_time - last_update_time, 1)}秒間更新されていません（2回連続未更新）")
-                                    logging.warning(f"カメラ {camera_id} の問題が検出されたため、ストリームを即座に再起動します")
-                                    restart_camera_stream(camera_id)
-                                    return  # 再起動したので監視スレッドを終了
-                        else:
-                            # TSファイルがない場合も問題とみなす
-                            if current_time - last_update_time > MAX_UPDATE_WAIT_TIME:
-                                consecutive_no_updates += 1
-                                if consecutive_no_updates >= 2:
-                                    logging.warning(f"カメラ {camera_id} で問題を検出: TSファイルが存在しません（2回連続未更新）")
-                                    logging.warning(f"カメラ {camera_id} の問題が検出されたため、ストリームを即座に再起動します")
-                                    restart_camera_stream(camera_id)
-                                    return  # 再起動したので監視スレッドを終了
-                # スリープして負荷軽減
-                time.sleep(0.5)
-            except Exception as e:
-                logging.error(f"カメラ {camera_id} の監視中にエラーが発生: {str(e)}\n{traceback.format_exc()}")
-                time.sleep(1)
-        logging.info(f"カメラ {camera_id} のHLS監視スレッドを終了します")
-    except Exception as e:
-        logging.error(f"カメラ {camera_id} のHLS監視スレッドでエラーが発生: {str(e)}\n{traceback.format_exc()}")
+        with os.scandir(paths.tmp_dir) as it:
+            for entry in it:
+                if entry.name == m3u8_name:
+                    m3u8_size = entry.stat().st_size
+                elif entry.name.endswith('.ts'):
+                    latest_ts_time = max(latest_ts_time, entry.stat().st_mtime)
+    except OSError:
+        return
+    if m3u8_size is None:
+        return
+    # プレイリストのサイズ変化か新しいtsファイルがあれば更新ありと判断
+    if m3u8_size != state.m3u8_size or latest_ts_time > state.last_ts_time:
+        state.m3u8_size = m3u8_size
+        state.last_ts_time = max(state.last_ts_time, latest_ts_time)
+        state.last_update = time.time()
+
+def _scan_ts_files(camera_tmp_dir):
+    """
+    フォルダ内のtsファイルを1回のscandirで列挙する
+
+    Args:
+        camera_tmp_dir (str): カメラのHLS出力フォルダ
+
+    Returns:
+        list: (ファイル名, 更新時刻) のリスト
+    """
+    ts_files = []
+    with os.scandir(camera_tmp_dir) as it:
+        for entry in it:
+            if entry.name.endswith('.ts'):
+                ts_files.append((entry.name, entry.stat().st_mtime))
+    return ts_files
 
 def restart_camera_stream(camera_id):
     """
@@ -651,29 +1059,26 @@ def restart_camera_stream(camera_id):
     Returns:
         bool: 再起動に成功したかどうか
     """
-    global restart_counts
-    
     try:
         # 再起動回数をインクリメント
-        if camera_id in restart_counts:
-            restart_counts[camera_id] += 1
-        else:
-            restart_counts[camera_id] = 1
+        state = stream_states.setdefault(camera_id, StreamState())
+        state.restart_count += 1
         
-        count = restart_counts[camera_id]
+        count = state.restart_count
         logging.info(f"カメラ {camera_id} のストリーミングを再起動しています (試行 {count}/{MAX_RESTART_COUNT})")
         
-        # 再起動回数が多すぎる場合は長めの冷却時間を設ける
+        # 再起動回数が多すぎる場合は長めの冷却時間を設ける（待機はせず、冷却後の再起動を予約する）
         if count > MAX_RESTART_COUNT:
             cooling_time = RESTART_COOLDOWN * 2
             logging.warning(f"カメラ {camera_id} の再起動回数が多すぎます。{cooling_time}秒間待機します")
-            time.sleep(cooling_time)
-            # 再起動カウントをリセット
-            restart_counts[camera_id] = 1
+            # 再起動カウントをリセット（予約した再起動で1回目になる）
+            state.restart_count = 0
+            _defer_restart(camera_id, cooling_time)
+            return True
         
         # プロセスの終了を確認
-        if camera_id in streaming_processes:
-            process = streaming_processes[camera_id]
+        process = streaming_processes.get(camera_id)
+        if process is not None:
             try:
                 if process and process.poll() is None:
                     # まだ実行中なら強制終了
@@ -689,10 +1094,9 @@ def restart_camera_stream(camera_id):
             # リソース解放
             cleanup_camera_resources(camera_id)
         
-        # ストリーミングプロセスから削除
-        with streaming_lock:
-            if camera_id in streaming_processes:
-                cleanup_camera_resources(camera_id)
+        # ストリーミングプロセスから削除（cleanup_camera_resourcesがロックを取るのでここでは取らない）
+        if camera_id in streaming_processes:
+            cleanup_camera_resources(camera_id)
         
         # 標準の待機時間
         time.sleep(1)
@@ -705,7 +1109,7 @@ def restart_camera_stream(camera_id):
             return False
         
         # ストリーミングキューに追加して再起動
-        streaming_queue.put(camera_info)
+        _enqueue_streaming(camera_info)
         logging.info(f"カメラ {camera_id} を再起動キューに入れました")
         return True
         
@@ -720,29 +1124,19 @@ def cleanup_camera_resources(camera_id):
     Args:
         camera_id (str): クリーンアップするカメラID
     """
-    global active_streams_count
     try:
         logging.info(f"Cleaning up resources for camera {camera_id}")
         # ストリーミングキャッシュから削除
-        with streaming_lock:
-            if camera_id in streaming_processes:
-                process = streaming_processes[camera_id]
-                try:
-                    # プロセスを停止
-                    ffmpeg_utils.terminate_process(process)
-                except:
-                    pass
-                del streaming_processes[camera_id]
-                # アクティブストリーム数を必ず減算
-                active_streams_count = max(0, active_streams_count - 1)
-                logging.info(f"カメラ {camera_id} のストリーミングプロセスを削除しました。アクティブストリーム: {active_streams_count}")
+        process = _remove_stream(camera_id)
+        if process is not None:
+            try:
+                # プロセスを停止
+                ffmpeg_utils.terminate_process(process)
+            except:
+                pass
+            logging.info(f"カメラ {camera_id} のストリーミングプロセスを削除しました。アクティブストリーム: {active_streams_count}")
         # ストリーミングの監視データを削除
-        if camera_id in hls_last_update:
-            del hls_last_update[camera_id]
-        if camera_id in m3u8_last_size:
-            del m3u8_last_size[camera_id]
-        if camera_id in restart_counts:
-            del restart_counts[camera_id]
+        stream_states.pop(camera_id, None)
         # 残っているffmpegプロセスを強制終了
         ffmpeg_utils.kill_ffmpeg_processes(camera_id)
         # 古いセグメントファイルを削除
@@ -750,6 +1144,38 @@ def cleanup_camera_resources(camera_id):
     except Exception as e:
         logging.error(f"Error cleaning up resources for camera {camera_id}: {e}")
 
+def _remove_segments(camera_id, paths, reason):
+    """
+    セグメントファイルをまとめて削除し、件数をログに出す
+
+    Args:
+        camera_id (str): カメラID
+        paths (list): 削除するファイルパスのリスト
+        reason (str): ログに出す削除理由
+    """
+    deleted_count = 0
+    for path in paths:
+        try:
+            os.unlink(path)
+            deleted_count += 1
+        except FileNotFoundError:
+            pass
+        except Exception as del_err:
+            logging.error(f"TSファイル削除エラー: {path}, {del_err}")
+    if deleted_count > 0:
+        logging.info(f"カメラ {camera_id} の{reason}TSファイル {deleted_count} 個を削除しました")
+
+def _schedule_segment_removal(camera_id, paths, reason):
+    """
+    削除件数が多い場合はバックグラウンドで、少なければその場で削除する
+    """
+    if not paths:
+        return
+    if len(paths) > SEGMENT_CLEANUP_BACKGROUND_MIN:
+        _segment_cleanup_pool.submit(_remove_segments, camera_id, paths, reason)
+    else:
+        _remove_segments(camera_id, paths, reason)
+
 def cleanup_old_segments(camera_id, force=False):
     """
     古いHLSセグメントファイルを削除
@@ -759,61 +1185,50 @@ def cleanup_old_segments(camera_id, force=False):
         force (bool): 強制的に削除するかどうか
     """
     try:
-        camera_tmp_dir = os.path.join(config.TMP_PATH, camera_id)
+        paths = get_camera_paths(camera_id)
+        camera_tmp_dir = paths.tmp_dir
+        m3u8_path = paths.m3u8
         
-        if not os.path.exists(camera_tmp_dir):
+        # ディレクトリ内のtsファイルをカウント（更新時刻もscandirでまとめて取得、フォルダが無ければ何もしない）
+        try:
+            ts_files = _scan_ts_files(camera_tmp_dir)
+        except FileNotFoundError:
             return
-            
-        # m3u8プレイリストに含まれているセグメントを確認
-        m3u8_path = os.path.join(camera_tmp_dir, f"{camera_id}.m3u8")
-        active_segments = set()
         
-        # ディレクトリ内のtsファイルをカウント
-        ts_files = [f for f in os.listdir(camera_tmp_dir) if f.endswith('.ts')]
+        # m3u8プレイリストを直接開き、存在確認と読み込みを1回で行う
+        try:
+            # プレイリストは数KBなので一括で読み込む
+            with open(m3u8_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = None
+        except Exception as e:
+            logging.error(f"m3u8ファイル読み取りエラー: {e}")
+            return  # エラーの場合は削除を中止
         
         # m3u8ファイルがないがtsファイルが存在する状態を検出（異常状態）
-        if not os.path.exists(m3u8_path) and ts_files:
-            logging.warning(f"異常状態検出: カメラ {camera_id} のm3u8ファイルがないのにtsファイルが {len(ts_files)} 個存在します")
-            
-            if force:
-                # 強制削除が指定されている場合、すべてのtsファイルを削除
-                for ts_file in ts_files:
-                    try:
-                        os.remove(os.path.join(camera_tmp_dir, ts_file))
-                        logging.info(f"強制削除: {ts_file}")
-                    except Exception as del_err:
-                        logging.error(f"ファイル削除エラー: {del_err}")
+        if data is None:
+            if ts_files:
+                logging.warning(f"異常状態検出: カメラ {camera_id} のm3u8ファイルがないのにtsファイルが {len(ts_files)} 個存在します")
+                
+                if force:
+                    # 強制削除が指定されている場合、すべてのtsファイルを削除
+                    _schedule_segment_removal(
+                        camera_id, [os.path.join(camera_tmp_dir, ts_file) for ts_file, _ in ts_files], "強制削除で"
+                    )
             return
         
-        # m3u8ファイルが存在する場合、現在使用中のtsファイルを取得
-        if os.path.exists(m3u8_path):
-            try:
-                with open(m3u8_path, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line.endswith('.ts'):
-                            # セグメントファイル名を抽出
-                            segment_file = os.path.basename(line)
-                            active_segments.add(segment_file)
-            except Exception as e:
-                logging.error(f"m3u8ファイル読み取りエラー: {e}")
-                return  # エラーの場合は削除を中止
+        # 現在使用中のtsファイル名をm3u8から抽出
+        active_segments = {m.group(1).decode('utf-8') for m in _TS_RE.finditer(data)}
         
-        # m3u8に含まれていない古いtsファイルを削除
-        deleted_count = 0
-        for ts_file in ts_files:
-            if ts_file not in active_segments:
-                try:
-                    ts_file_path = os.path.join(camera_tmp_dir, ts_file)
-                    file_mtime = os.path.getmtime(ts_file_path)  # ← 追加
-                    if time.time() - file_mtime > 180:  # 3分以上前のファイル
-                        os.remove(ts_file_path)
-                        deleted_count += 1
-                except Exception as del_err:
-                    logging.error(f"古いTSファイル削除エラー: {del_err}")
-        
-        if deleted_count > 0:
-            logging.info(f"カメラ {camera_id} の古いTSファイル {deleted_count} 個を削除しました")
+        # m3u8に含まれていない古いtsファイル（3分以上前）を集めてまとめて削除
+        current_time = time.time()
+        stale_paths = [
+            os.path.join(camera_tmp_dir, ts_file)
+            for ts_file, file_mtime in ts_files
+            if ts_file not in active_segments and current_time - file_mtime > 180
+        ]
+        _schedule_segment_removal(camera_id, stale_paths, "古い")
     
     except Exception as e:
         logging.error(f"古いセグメント削除エラー（カメラ {camera_id}）: {e}")
@@ -823,78 +1238,94 @@ def global_health_monitor():
     すべてのストリーミングカメラの健全性を監視する
     404エラーが多発する場合、自動的に再起動する
     """
+    _lower_thread_priority()
     try:
         logging.info("Global health monitor started")
         
-        # カメラごとの連続404エラーをカウントする辞書
-        error_counts = {}
-        # 最後のm3u8確認時刻を記録する辞書
-        last_check_times = {}
+        # カメラID -> HealthCheckState（連続エラー回数と最後のm3u8確認時刻）
+        health_states = defaultdict(HealthCheckState)
+        
+        # 終了通知を受けたカメラIDの集合（pidfdが使えない環境ではNoneでprocess.poll()を使う）
+        exited = None
         
         while True:
             try:
                 # アクティブなストリーミングがない場合はスキップ
                 if not streaming_processes:
-                    time.sleep(HEALTH_CHECK_INTERVAL)
+                    exited = _wait_process_exits(HEALTH_CHECK_INTERVAL)
                     continue
                 
                 # 現在の時刻を記録
                 current_time = time.time()
                 
-                # すべてのカメラプロセスをチェック
-                for camera_id, process in list(streaming_processes.items()):
+                # すべてのカメラプロセスをチェック（辞書は差し替え式なので参照を1回取ればスナップショットになる）
+                snapshot = streaming_processes
+                # 終了しているのに記録が残っているカメラ（ループ後にまとめてクリーンアップ）
+                to_cleanup = []
+                for camera_id, process in snapshot.items():
                     try:
-                        # プロセスが終了しているか確認
-                        if process is None or process.poll() is not None:
+                        check = health_states[camera_id]
+                        # プロセスが終了しているか確認（pidfdを登録できなかったカメラはprocess.poll()で確認）
+                        if exited is None or camera_id not in _exit_pidfds:
+                            dead = process is None or process.poll() is not None
+                        else:
+                            dead = camera_id in exited
+                        if dead:
                             logging.warning(f"カメラ {camera_id} のプロセスが存在しないか終了しています (PID: {process.pid if process else 'None'})")
                             
                             # エラーカウントを増やす
-                            error_counts[camera_id] = error_counts.get(camera_id, 0) + 1
+                            check.error_count += 1
                             
                             # 一定回数以上エラーが発生したら再起動
-                            if error_counts[camera_id] >= 3:
+                            if check.error_count >= 3:
                                 logging.error(f"カメラ {camera_id} のプロセスが繰り返し終了しています。再起動します。")
-                                restart_camera_stream(camera_id)
+                                _request_restart(camera_id)
                                 # カウントをリセット
-                                error_counts[camera_id] = 0
+                                check.error_count = 0
+                            else:
+                                to_cleanup.append(camera_id)
                             
                             continue
                         
                         # HLSファイルの存在と更新時間を確認
-                        m3u8_file = os.path.join(config.TMP_PATH, camera_id, f"{camera_id}.m3u8")
-                        if not os.path.exists(m3u8_file):
+                        m3u8_file = get_camera_paths(camera_id).m3u8
+                        try:
+                            st = os.stat(m3u8_file)
+                        except FileNotFoundError:
+                            st = None
+                        if st is None:
                             logging.warning(f"カメラ {camera_id} のm3u8ファイルが見つかりません")
                             
                             # 前回のチェック時刻を取得
-                            last_check = last_check_times.get(camera_id, 0)
+                            last_check = check.last_check
                             
                             # 長時間ファイルが存在しない場合
                             if last_check > 0 and (current_time - last_check) > HLS_UPDATE_TIMEOUT * 2:
                                 logging.error(f"カメラ {camera_id} のm3u8ファイルが {HLS_UPDATE_TIMEOUT * 2}秒以上存在しません。再起動します。")
-                                restart_camera_stream(camera_id)
+                                _request_restart(camera_id)
                                 # 最終チェック時刻をリセット
-                                last_check_times[camera_id] = current_time
+                                check.last_check = current_time
                             else:
-                                # 初回または短時間の場合は記録
-                                last_check_times[camera_id] = last_check_times.get(camera_id, current_time)
+                                # 初回の場合は記録
+                                if not last_check:
+                                    check.last_check = current_time
                             
                             continue
                         
                         # 最終更新時刻を確認
                         try:
-                            mtime = os.path.getmtime(m3u8_file)
+                            mtime = st.st_mtime
                             if current_time - mtime > HLS_UPDATE_TIMEOUT:
                                 logging.warning(f"カメラ {camera_id} のm3u8ファイルが {current_time - mtime:.1f}秒間更新されていません")
                                 # 一定時間以上更新がなければ再起動
                                 if current_time - mtime > HLS_UPDATE_TIMEOUT * 2:
                                     logging.error(f"カメラ {camera_id} のm3u8ファイルが {HLS_UPDATE_TIMEOUT * 2}秒以上更新されていません。再起動します。")
-                                    restart_camera_stream(camera_id)
+                                    _request_restart(camera_id)
                             else:
                                 # 正常な場合はエラーカウントをリセット
-                                if camera_id in error_counts:
-                                    error_counts[camera_id] = 0
-                                if camera_id in last_check_times:
-                                    last_check_times[camera_id] = current_time
+                                check.error_count = 0
+                                if check.last_check:
+                                    check.last_check = current_time
                         
                         except Exception as e:
                             logging.error(f"カメラ {camera_id} のm3u8ファイル確認中にエラー: {e}")
@@ -902,23 +1333,18 @@ def global_health_monitor():
                     except Exception as e:
                         logging.error(f"カメラ {camera_id} の健全性確認中にエラー: {e}")
                 
-                # プロセスが終了しているが、まだ辞書に残っているものを検出
-                for camera_id, process in list(streaming_processes.items()):
-                    if process and process.poll() is not None:
-                        logging.warning(f"カメラ {camera_id} のプロセスが終了しているのに記録が残っています。クリーンアップします。")
-                        # すでに終了している場合はクリーンアップ
-                        cleanup_camera_resources(camera_id)
-                        # ストリーミングプロセス辞書から削除
-                        with streaming_lock:
-                            if camera_id in streaming_processes:
-                                del streaming_processes[camera_id]
-                                global active_streams_count
-                                active_streams_count = max(0, active_streams_count - 1)
+                # プロセスが終了しているが、まだ辞書に残っているものをクリーンアップ
+                # （cleanup_camera_resourcesが辞書からの削除とアクティブ数の減算も行う）
+                for camera_id in to_cleanup:
+                    if streaming_processes.get(camera_id) is not snapshot.get(camera_id):
+                        continue  # チェック中に再起動済み
+                    logging.warning(f"カメラ {camera_id} のプロセスが終了しているのに記録が残っています。クリーンアップします。")
+                    cleanup_camera_resources(camera_id)
                 
                 # 長時間停止したカメラを検出して自動起動
                 try:
                     all_cameras = camera_utils.get_enabled_cameras()
-                    active_camera_ids = set(streaming_processes.keys())
+                    active_camera_ids = streaming_processes.keys()
                     
                     for camera in all_cameras:
                         camera_id = camera['id']
@@ -930,27 +1356,29 @@ def global_health_monitor():
                 except Exception as e:
                     logging.error(f"非アクティブカメラの検出中にエラー: {e}")
                 
-                # 間隔を空けて次の健全性チェック
-                time.sleep(HEALTH_CHECK_INTERVAL)
+                # 間隔を空けて次の健全性チェック（プロセスが終了した場合はその時点で次のチェックへ）
+                exited = _wait_process_exits(HEALTH_CHECK_INTERVAL)
                 
             except Exception as e:
                 logging.error(f"全体的な健全性監視中にエラー: {e}")
                 time.sleep(HEALTH_CHECK_INTERVAL)
     
     except Exception as e:
-        logging.error(f"健全性監視スレッドでエラーが発生: {e}")
-        logging.error(traceback.format_exc())
+        logging.exception(f"健全性監視スレッドでエラーが発生: {e}")
 
 def cleanup_scheduler():
     """
     定期的なクリーンアップタスクを実行
     """
+    _lower_thread_priority()
     while True:
         try:
             logging.info("Running scheduled cleanup")
+            # 辞書は差し替え式なので参照を1回取れば今回のチェック中は変化しないスナップショットになる
+            snapshot = streaming_processes
             
             # 各カメラについて古いセグメントファイルを削除
-            for camera_id in list(streaming_processes.keys()):
+            for camera_id in snapshot:
                 cleanup_old_segments(camera_id)
             
             # ディスク使用量の確認
@@ -958,7 +1386,7 @@ def cleanup_scheduler():
             if not disk_ok:
                 logging.warning("Low disk space detected. Performing thorough cleanup.")
                 # より積極的なクリーンアップを実行
-                for camera_id in list(streaming_processes.keys()):
+                for camera_id in snapshot:
                     cleanup_old_segments(camera_id)
             
             # 次の実行まで待機
@@ -968,17 +1396,65 @@ def cleanup_scheduler():
             logging.error(f"Error in cleanup scheduler: {e}")
             time.sleep(60)  # エラー時は1分待機
 
+def _sample_system_usage():
+    """
+    システム全体のCPU・メモリ使用率を取得する
+    Linuxでは/procを直接読み、それ以外はpsutilを使う
+
+    Returns:
+        tuple: (CPU使用率, メモリ使用率)
+    """
+    if sys.platform.startswith('linux'):
+        return fs_utils.read_cpu_stat(), fs_utils.read_meminfo()
+    return psutil.cpu_percent(interval=None), psutil.virtual_memory().percent
+
+# 負荷軽減で1台停止した後、CPU使用率を再確認するまでの待機時間（秒）
+SHED_LOAD_SETTLE_SECS = 5
+
+def _rank_streams_by_cpu(snapshot, window=1.0):
+    """
+    ストリーミング中のFFmpegプロセスをCPU使用率の高い順に並べる
+
+    Args:
+        snapshot (dict): カメラID -> プロセス（streaming_processesの参照）
+        window (float): CPU使用率を計測する時間（秒）
+
+    Returns:
+        list: CPU使用率の高い順のカメラID
+    """
+    procs = []
+    for camera_id, process in snapshot.items():
+        try:
+            proc = psutil.Process(process.pid)
+            proc.cpu_percent(interval=None)  # 計測の基準を作る
+            procs.append((camera_id, proc))
+        except Exception:
+            # 終了済みなどで計測できないものは負荷0として扱う
+            procs.append((camera_id, None))
+    time.sleep(window)
+    costs = []
+    for camera_id, proc in procs:
+        try:
+            cost = proc.cpu_percent(interval=None) if proc is not None else 0.0
+        except Exception:
+            cost = 0.0
+        costs.append((cost, camera_id))
+    costs.sort(key=lambda item: item[0], reverse=True)
+    return [camera_id for _, camera_id in costs]
+
 def monitor_system_resources():
     """
     システムリソースの使用状況を監視
     """
     global system_resources
     
+    # CPU使用率は前回呼び出しからの差分で計算するため、最初に一度呼んで基準を作る
+    _sample_system_usage()
+    
     while True:
         try:
-            # リソース情報を更新
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory_percent = psutil.virtual_memory().percent
+            # リソース情報を更新（前回チェックからの平均値をブロックせずに取得）
+            cpu_percent, memory_percent = _sample_system_usage()
             
             system_resources = {
                 'cpu': cpu_percent,
@@ -990,23 +1466,20 @@ def monitor_system_resources():
                 logging.warning(f"Critical system resources: CPU {cpu_percent}%, Memory {memory_percent}%")
                 
                 # 一部のプロセスを停止して負荷を減らす
-                if len(streaming_processes) > 5:
+                snapshot = streaming_processes
+                if len(snapshot) > 5:
                     logging.warning("Temporarily stopping some streaming processes to reduce load")
                     
-                    # プロセスの一部（最大5つ）を停止
-                    count = 0
-                    for camera_id in list(streaming_processes.keys()):
-                        if count >= 5:
-                            break
-                            
+                    # CPU使用率の高いプロセスから最大5つを停止
+                    for camera_id in _rank_streams_by_cpu(snapshot)[:5]:
                         logging.info(f"Temporarily stopping streaming for camera {camera_id} due to high system load")
                         cleanup_camera_resources(camera_id)
-                        count += 1
                         
-                        # 少し待ってリソース使用量の変化を確認
-                        time.sleep(5)
+                        # 停止後に計測の基準を取り直し、落ち着くまで待ってからその間の平均値で確認する
+                        _sample_system_usage()
+                        time.sleep(SHED_LOAD_SETTLE_SECS)
                         
-                        cpu_current = psutil.cpu_percent(interval=1)
+                        cpu_current, _ = _sample_system_usage()
                         if cpu_current < 70:
                             logging.info(f"System resources improved: CPU {cpu_current}%")
                             break
@@ -1022,11 +1495,20 @@ def stop_all_streaming():
     """
     すべてのストリーミングプロセスを停止
     """
-    global active_streams_count
+    global active_streams_count, streaming_processes
     logging.info("Stopping all streaming processes")
     
-    # 各プロセスを停止
-    for camera_id, process in list(streaming_processes.items()):
+    # 辞書・アクティブ数・終了通知の登録を1回のロックでまとめて初期化
+    with streaming_lock:
+        processes = streaming_processes
+        streaming_processes = {}
+        active_streams_count = 0
+        for camera_id in processes:
+            _unwatch_process_exit(camera_id)
+    stream_states.clear()
+    
+    # 各プロセスを停止（待機が発生するのでロックの外で行う）
+    for camera_id, process in processes.items():
         try:
             logging.info(f"Stopping streaming for camera {camera_id}")
             ffmpeg_utils.terminate_process(process)
@@ -1034,20 +1516,13 @@ def stop_all_streaming():
         except Exception as e:
             logging.error(f"Error stopping streaming for camera {camera_id}: {e}")
     
-    # 再初期化
-    streaming_processes.clear()
-    hls_last_update.clear()
-    m3u8_last_size.clear()
-    restart_counts.clear()
-    
-    # 残っているプロセスを強制終了
-    try:
-        ffmpeg_utils.kill_ffmpeg_processes()
-    except Exception as e:
-        logging.error(f"Error killing remaining ffmpeg processes: {e}")
-    
-    with streaming_lock:
-        active_streams_count = 0
+    # 停止しきれなかったプロセスだけを強制終了（回収済みのPIDは再利用されている可能性があるので除く）
+    remaining = [process.pid for process in processes.values() if process is not None and process.poll() is None]
+    if remaining:
+        try:
+            ffmpeg_utils.kill_ffmpeg_processes(pids=remaining)
+        except Exception as e:
+            logging.error(f"Error killing remaining ffmpeg processes: {e}")
     
     logging.info("All streaming processes stopped")
     return True
@@ -1064,11 +1539,13 @@ def initialize_streaming():
     # 残っているffmpegプロセスをクリーンアップ
     ffmpeg_utils.kill_ffmpeg_processes()
     
-    # 各カメラのディレクトリを準備
+    # 各カメラのディレクトリを準備（既存のフォルダは1回のscandirで確認し、無いものだけ作成）
     cameras = camera_utils.get_enabled_cameras()
+    with os.scandir(config.TMP_PATH) as it:
+        existing = {entry.name for entry in it if entry.is_dir()}
     for camera in cameras:
-        camera_dir = os.path.join(config.TMP_PATH, camera['id'])
-        fs_utils.ensure_directory_exists(camera_dir)
+        if camera['id'] not in existing:
+            os.makedirs(get_camera_paths(camera['id']).tmp_dir, exist_ok=True)
     
     logging.info("Streaming module initialized")
     
@@ -1107,16 +1584,10 @@ def start_all_cameras_streaming(cameras=None):
         
         logging.info(f"Starting streaming for {len(cameras)} cameras")
         
-        # 各カメラのストリーミングをスレッドで並列起動
-        threads = []
+        # 各カメラの起動要求をワーカーのキューに入れる（実際の起動はstreaming_workerが並列に行う）
         for camera in cameras:
             logging.info(f"Queueing streaming start for camera {camera['id']} ({camera['name']})")
-            t = threading.Thread(target=get_or_start_streaming, args=(camera,))
-            t.start()
-            threads.append(t)
-        # 全スレッドの完了を待つ（厳密な同時起動を目指す場合）
-        for t in threads:
-            t.join(timeout=2)
+            get_or_start_streaming(camera)
         return True
         
     except Exception as e:
@@ -1134,11 +1605,10 @@ def scheduled_cleanup():
         logging.info("定期クリーンアップ処理を実行中...")
         
         # 各カメラディレクトリ内の古いtsファイルを削除
-        for camera_id in streaming_processes.keys():
+        for camera_id in streaming_processes:
             try:
-                camera_tmp_dir = os.path.join(config.TMP_PATH, camera_id)
-                if os.path.exists(camera_tmp_dir):
-                    cleanup_old_segments(camera_id)
+                # フォルダが無い場合はcleanup_old_segments側で何もせずに戻る
+                cleanup_old_segments(camera_id)
             except Exception as e:
                 logging.error(f"カメラ {camera_id} のクリーンアップエラー: {e}")
         
@@ -1157,8 +1627,6 @@ def start_hls_streaming(camera_id):
     Returns:
         bool: 開始に成功したかどうか
     """
-    global streaming_processes, active_streams_count
-    
     try:
         # カメラIDが無効な場合はエラー
         if not camera_id:
@@ -1186,19 +1654,21 @@ def start_hls_streaming(camera_id):
             time.sleep(1)  # 少し待ってから再開
         
         # 出力ディレクトリの準備
-        camera_tmp_dir = os.path.join(config.TMP_PATH, camera_id)
+        paths = get_camera_paths(camera_id)
+        camera_tmp_dir = paths.tmp_dir
         os.makedirs(camera_tmp_dir, exist_ok=True)
         
         # M3U8出力パス
-        m3u8_path = os.path.join(camera_tmp_dir, f"{camera_id}.m3u8")
+        m3u8_path = paths.m3u8
         
-        # 競合の防止のため、既存のm3u8ファイルを削除
-        if os.path.exists(m3u8_path):
-            try:
-                os.remove(m3u8_path)
-                logging.info(f"既存のm3u8ファイルを削除しました: {m3u8_path}")
-            except Exception as e:
-                logging.warning(f"m3u8ファイル削除エラー: {e}")
+        # 競合の防止のため、既存のm3u8ファイルを削除（存在確認はせず、無ければ何もしない）
+        try:
+            os.remove(m3u8_path)
+            logging.info(f"既存のm3u8ファイルを削除しました: {m3u8_path}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"m3u8ファイル削除エラー: {e}")
         
         # ログファイルパス
         timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
@@ -1234,54 +1704,57 @@ def start_hls_streaming(camera_id):
             logging.error(f"FFmpegプロセスの起動に失敗しました（カメラ {camera_id}）")
             return False
         
-        # グローバル変数に保存
-        streaming_processes[camera_id] = process
-        active_streams_count += 1
+        # グローバル変数に保存（アクティブストリーム数も加算される）
+        _set_stream_process(camera_id, process)
         
-        # M3U8ファイルの生成を待つ
-        m3u8_wait_count = 0
-        while not os.path.exists(m3u8_path) and m3u8_wait_count < 30:  # 最大30秒待機
-            logging.info(f"カメラ {camera_id} のm3u8ファイル生成を待機中...")
-            time.sleep(1)
-            m3u8_wait_count += 1
+        # M3U8ファイルの生成を共有の待機スレッドで待つ（変更通知が有効なら生成された時点で戻る）
+        stream_states[camera_id] = StreamState(last_update=time.time())
+        logging.info(f"カメラ {camera_id} のm3u8ファイル生成を待機中...")
+        wait_result = []
+        wait_done = threading.Event()
+
+        def on_wait_result(status):
+            wait_result.append(status)
+            wait_done.set()
+
+        _ready_watcher.wait_for(
+            camera_tmp_dir,
+            f"{camera_id}.m3u8",
+            timeout=HLS_CREATION_TIMEOUT,
+            callback=on_wait_result,
+            process=process
+        )
+        wait_done.wait(HLS_CREATION_TIMEOUT + _ReadyWatcher.EVENT_POLL_INTERVAL * 2)
+        status = wait_result[0] if wait_result else 'timeout'
+        
+        # プロセスが途中で終了していないか確認
+        if status == 'failed':
+            exit_code = process.poll()
+            logging.error(f"m3u8待機中にFFmpegプロセスが終了しました（終了コード: {exit_code}）")
             
-            # プロセスが途中で終了していないか確認
-            if process.poll() is not None:
-                exit_code = process.poll()
-                logging.error(f"m3u8待機中にFFmpegプロセスが終了しました（終了コード: {exit_code}）")
-                
-                # エラー出力を確認
-                try:
-                    if os.path.exists(log_path):
-                        with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
-                            error_output = f.read()
-                            logging.error(f"FFmpegエラー出力: {error_output}")
-                except Exception as log_err:
-                    logging.error(f"ログファイル読み取りエラー: {log_err}")
-                
-                # プロセスを無効化
-                streaming_processes.pop(camera_id, None)
-                active_streams_count = max(0, active_streams_count - 1)
-                return False
+            # エラー出力を確認
+            try:
+                if os.path.exists(log_path):
+                    with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+                        error_output = f.read()
+                        logging.error(f"FFmpegエラー出力: {error_output}")
+            except Exception as log_err:
+                logging.error(f"ログファイル読み取りエラー: {log_err}")
+            
+            # プロセスを無効化
+            _remove_stream(camera_id)
+            return False
         
         # M3U8ファイルが生成されたかを確認
-        if not os.path.exists(m3u8_path):
+        if status != 'ready':
             logging.error(f"m3u8ファイルが生成されませんでした: {m3u8_path}")
             # プロセスを終了
+            _remove_stream(camera_id)
             ffmpeg_utils.terminate_process(process)
-            streaming_processes.pop(camera_id, None)
-            active_streams_count = max(0, active_streams_count - 1)
             return False
         
         # 監視スレッドを開始
-        monitor_thread = threading.Thread(
-            target=monitor_hls_updates,
-            args=(camera_id,),
-            daemon=True,
-            name=f"hls-monitor-{camera_id}"
-        )
-        monitor_threads[camera_id] = monitor_thread
-        monitor_thread.start()
+        _start_monitor(camera_id, process)
         
         logging.info(f"カメラ {camera_id} のHLSストリーミングを開始しました（PID: {process.pid}）")
         return True
@@ -1289,11 +1762,10 @@ def start_hls_streaming(camera_id):
     except Exception as e:
         logging.error(f"HLSストリーミング開始エラー（カメラ {camera_id}）: {e}")
         # 例外発生時は、プロセスがあれば終了
-        if camera_id in streaming_processes:
+        process = _remove_stream(camera_id)
+        if process is not None:
             try:
-                ffmpeg_utils.terminate_process(streaming_processes[camera_id])
-                streaming_processes.pop(camera_id, None)
-                active_streams_count = max(0, active_streams_count - 1)
+                ffmpeg_utils.terminate_process(process)
             except Exception as term_err:
                 logging.error(f"プロセス終了エラー: {term_err}")
         return False
@@ -1308,29 +1780,21 @@ def terminate_streaming(camera_id):
     Returns:
         bool: 停止に成功したかどうか
     """
-    global streaming_processes, active_streams_count
-    
     try:
         logging.info(f"カメラ {camera_id} のストリーミングを停止します")
         
-        if camera_id not in streaming_processes:
+        # ディクショナリからの削除とカウンターの更新を1回のロックで行う
+        process = _remove_stream(camera_id)
+        if process is None:
             logging.warning(f"カメラ {camera_id} のストリーミングプロセスは存在しません")
             return True
         
-        # プロセスを取得して停止
-        process = streaming_processes[camera_id]
+        # プロセスを停止（ロックの外で行う）
         ffmpeg_utils.terminate_process(process)
         
         # 残っているプロセスを強制終了
         ffmpeg_utils.kill_ffmpeg_processes(camera_id=camera_id)
         
-        # カウンターを更新
-        with streaming_lock:
-            active_streams_count = max(0, active_streams_count - 1)
-        
-        # ディクショナリから削除
-        del streaming_processes[camera_id]
-        
         logging.info(f"カメラ {camera_id} のストリーミングを正常に停止しました")
         return True
         
@@ -1355,8 +1819,7 @@ def start_streaming(camera_id, rtsp_url, output_dir):
         camera_dir = os.path.join(output_dir, str(camera_id))
 
         # ディレクトリが存在しなければ作成
-        if not os.path.exists(camera_dir):
-            os.makedirs(camera_dir)
+        os.makedirs(camera_dir, exist_ok=True)
 
         # 出力ファイルのパスを設定
         output_path = os.path.join(camera_dir, f"{camera_id}.m3u8")
@@ -1374,13 +1837,12 @@ def start_streaming(camera_id, rtsp_url, output_dir):
         # サブプロセスでFFmpegを起動
         logging.info(f"FFmpeg starting for camera {camera_id} with command: {' '.join(cmd)}")
         
-        # 標準出力と標準エラー出力をパイプに接続
+        # 標準エラー出力は標準出力にまとめて1本のパイプで受け取る（片方の読み込み待ちでもう片方が詰まらないようにする）
+        # 出力はバイト列のまま読み、デコードはログに出す行だけ行う
         process = subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
-            bufsize=1  # ラインバッファリング
+            stderr=subprocess.STDOUT
         )
 
         # プロセスIDをグローバル辞書に保存
@@ -1410,10 +1872,9 @@ def start_streaming(camera_id, rtsp_url, output_dir):
         if process.poll() is not None:
             # プロセスが既に終了している場合
             returncode = process.poll()
-            stdout, stderr = process.communicate()
+            # 出力は読み込みスレッドが読み出しているので、ここではパイプを読まない
             error_msg = f"FFmpegプロセスの起動に失敗しました。終了コード: {returncode}"
             logging.error(error_msg)
-            logging.error(f"FFmpegエラー出力: {stderr}")
             
             # プロセス情報を更新
             camera_processes[camera_id].update({
@@ -1428,8 +1889,7 @@ def start_streaming(camera_id, rtsp_url, output_dir):
         return True
         
     except Exception as e:
-        logging.error(f"Failed to start streaming for camera {camera_id}: {str(e)}")
-        traceback.print_exc()
+        logging.exception(f"Failed to start streaming for camera {camera_id}: {str(e)}")
         return False
 
 def _process_ffmpeg_output(process, camera_id, rtsp_url, output_dir):
@@ -1446,50 +1906,80 @@ def _process_ffmpeg_output(process, camera_id, rtsp_url, output_dir):
         logging.info(f"カメラ {camera_id} のFFmpeg出力モニタリングを開始")
         error_count = 0
         last_progress_time = time.time()
+        # 通常行のDEBUGログは行ごとにデコードが走るので、無効なら最初から出さない
+        debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+        # stderrはstdoutにまとめて起動しているので1本のパイプだけを読む
+        pipe = process.stdout
+        fd = pipe.fileno()
+        # 行末まで届いていない出力
+        pending = b""
+        # POSIXではselectorsで出力を待つ（Windowsのselectはパイプに使えないため出力が来るまでos.readで待つ）
+        sel = None
+        if os.name != 'nt':
+            sel = selectors.DefaultSelector()
+            sel.register(pipe, selectors.EVENT_READ)
         
-        # ループでプロセスの出力を読み込む
-        while process.poll() is None:  # プロセスが実行中の間
-            try:
-                # 標準出力を読み込む
-                stdout_line = process.stdout.readline()
-                if stdout_line:
-                    logging.debug(f"FFmpeg stdout [{camera_id}]: {stdout_line.strip()}")
-                    last_progress_time = time.time()
-                
-                # 標準エラー出力を読み込む
-                stderr_line = process.stderr.readline()
-                if stderr_line:
-                    stderr_text = stderr_line.strip()
-                    # エラーメッセージを検出
-                    if "Error" in stderr_text or "error" in stderr_text.lower():
-                        error_count += 1
-                        logging.error(f"FFmpeg error [{camera_id}]: {stderr_text}")
-                        # エラーカウントが閾値を超えた場合
-                        if error_count > 10:
-                            logging.error(f"カメラ {camera_id} で多数のエラーが検出されました。プロセスを再起動します。")
+        try:
+            # ループでプロセスの出力を読み込む
+            while process.poll() is None:  # プロセスが実行中の間
+                try:
+                    lines = ()
+                    if sel is None or sel.select(timeout=1.0):
+                        # 届いている出力をまとめて読み、行に分ける（進捗表示は\rで区切られる）
+                        chunk = os.read(fd, 65536)
+                        if not chunk:
+                            # パイプが閉じられた（プロセス終了）
+                            try:
+                                process.wait(timeout=5)
+                            except subprocess.TimeoutExpired:
+                                pass
                             break
-                    else:
-                        # 通常のログメッセージ
-                        logging.debug(f"FFmpeg stderr [{camera_id}]: {stderr_text}")
-                        # 進行状況のメッセージを検出して進捗を記録
-                        if "frame=" in stderr_text and "time=" in stderr_text:
-                            last_progress_time = time.time()
-                
-                # 進捗がない状態が長く続く場合
-                if time.time() - last_progress_time > 30:  # 30秒以上進捗がない
-                    logging.warning(f"カメラ {camera_id} の処理で30秒以上進捗がありません。")
-                    error_count += 1
-                    last_progress_time = time.time()  # リセット
-                    if error_count > 5:
-                        logging.error(f"カメラ {camera_id} での進捗がなさすぎるため、プロセスを再起動します。")
+                        *lines, pending = re.split(rb'[\r\n]+', pending + chunk)
+                    
+                    too_many_errors = False
+                    for output in lines:
+                        output = output.strip()
+                        if not output:
+                            continue
+                        # 1回の正規表現でエラー行・進捗行を判定
+                        match = _FFMPEG_STDERR_RE.match(output)
+                        kind = match.lastgroup if match else None
+                        if kind == 'err':
+                            error_count += 1
+                            logging.error(f"FFmpeg error [{camera_id}]: {output.decode('utf-8', errors='replace')}")
+                            # エラーカウントが閾値を超えた場合
+                            if error_count > 10:
+                                too_many_errors = True
+                                break
+                        else:
+                            # 通常のログメッセージ
+                            if debug_enabled:
+                                logging.debug("FFmpeg output [%s]: %s", camera_id, output.decode('utf-8', errors='replace'))
+                            # 進行状況のメッセージを検出して進捗を記録
+                            if kind == 'progress':
+                                last_progress_time = time.time()
+                    if too_many_errors:
+                        logging.error(f"カメラ {camera_id} で多数のエラーが検出されました。プロセスを再起動します。")
+                        ffmpeg_utils.terminate_process(process)
                         break
-                
-                # ストリーミングログの処理負荷を減らすために短い待機を入れる
-                time.sleep(0.1)
-                
-            except Exception as read_err:
-                logging.error(f"カメラ {camera_id} の出力読み取り中にエラー: {read_err}")
-                time.sleep(1)
+                    
+                    # 進捗がない状態が長く続く場合
+                    if time.time() - last_progress_time > 30:  # 30秒以上進捗がない
+                        logging.warning(f"カメラ {camera_id} の処理で30秒以上進捗がありません。")
+                        error_count += 1
+                        last_progress_time = time.time()  # リセット
+                        if error_count > 5:
+                            logging.error(f"カメラ {camera_id} での進捗がなさすぎるため、プロセスを再起動します。")
+                            ffmpeg_utils.terminate_process(process)
+                            break
+                    
+                except Exception as read_err:
+                    logging.error(f"カメラ {camera_id} の出力読み取り中にエラー: {read_err}")
+                    time.sleep(1)
+        finally:
+            if sel is not None:
+                sel.close()
+            pipe.close()
         
         # プロセスが終了した場合
         exit_code = process.poll()
@@ -1503,12 +1993,12 @@ def _process_ffmpeg_output(process, camera_id, rtsp_url, output_dir):
             camera = camera_utils.get_camera_by_id(camera_id)
             # enabled=1以外は絶対にストリーミングしない
             if camera and camera.get('enabled', 1) == 1:
-                streaming_queue.put(camera)
+                _enqueue_streaming(camera)
             else:
                 logging.info(f"カメラ {camera_id} は無効設定のため再起動しません")
         
     except Exception as e:
-        logging.error(f"カメラ {camera_id} のFFmpeg出力処理中に予期しないエラー: {e}")
+        logging.exception(f"カメラ {camera_id} のFFmpeg出力処理中に予期しないエラー: {e}")
 
 def watchdog_monitor_threads():
     """
@@ -1518,21 +2008,22 @@ def watchdog_monitor_threads():
     while True:
         try:
             for camera_id, thread in list(monitor_threads.items()):
-                if not thread.is_alive():
+                if not _is_monitor_alive(thread):
+                    proc = streaming_processes.get(camera_id)
+                    if proc is None:
+                        # ストリーミングが終了済みのカメラは監視対象から外す
+                        monitor_threads.pop(camera_id, None)
+                        continue
                     logging.error(f"ウォッチドッグ: カメラ{camera_id}の監視スレッドが死んでいます。自動再生成します")
-                    t = threading.Thread(target=monitor_hls_updates, args=(camera_id,), daemon=True, name=f"hls-monitor-{camera_id}")
-                    monitor_threads[camera_id] = t
-                    t.start()
+                    _start_monitor(camera_id, proc)
             # streaming_processesの整合性もチェック
-            for camera_id, proc in list(streaming_processes.items()):
+            for camera_id, proc in streaming_processes.items():
                 if camera_id not in monitor_threads:
                     logging.warning(f"ウォッチドッグ: カメラ{camera_id}の監視スレッドが存在しません。自動生成します")
-                    t = threading.Thread(target=monitor_hls_updates, args=(camera_id,), daemon=True, name=f"hls-monitor-{camera_id}")
-                    monitor_threads[camera_id] = t
-                    t.start()
+                    _start_monitor(camera_id, proc)
             time.sleep(watchdog_interval)
         except Exception as e:
-            logging.error(f"ウォッチドッグ監視中に例外: {e}\n{traceback.format_exc()}")
+            logging.exception(f"ウォッチドッグ監視中に例外: {e}")
             time.sleep(10)
 
 def dump_monitor_status():
@@ -1540,10 +2031,10 @@ def dump_monitor_status():
         try:
             logging.info("==== [監視スレッド/プロセス状態ダンプ] ====")
             for camera_id, proc in streaming_processes.items():
-                alive = monitor_threads.get(camera_id).is_alive() if camera_id in monitor_threads else False
+                alive = _is_monitor_alive(monitor_threads[camera_id]) if camera_id in monitor_threads else False
                 logging.info(f"カメラ{camera_id}: プロセスPID={getattr(proc, 'pid', None)}, 監視スレッド生存={alive}")
             logging.info("==== [ダンプここまで] ====")
             time.sleep(120)
         except Exception as e:
-            logging.error(f"監視状態ダンプ中に例外: {e}\n{traceback.format_exc()}")
+            logging.exception(f"監視状態ダンプ中に例外: {e}")
             time.sleep(30)